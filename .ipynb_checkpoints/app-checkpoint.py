@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import altair as alt
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pandas.api.types import union_categoricals
 
-# Disable Altair row limit so multi-year data doesn't silently break
-alt.data_transformers.disable_max_rows()
+# Shared with app_old.py: the sampled scatter's grouping, colours and deck.gl layers
+import crime_map
 
 # -------------------------
 # PAGE CONFIG
@@ -123,54 +129,486 @@ st.caption("IS445 • Expert-facing Streamlit dashboard for exploring Chicago cr
 # DATA LOADING
 # -------------------------
 
+# Per-year Parquet files are produced once from the CSVs by project/convert_to_parquet.py
 YEAR_TO_FILE = {
-    year: f"project/data/Crimes_{year}.csv"
+    year: f"project/data/Crimes_{year}.parquet"
     for year in range(2010, 2021)  # 2010–2020 inclusive on HuggingFace
 }
 
+# Only the columns the dashboard actually uses are read from disk
+NEEDED_COLS = [
+    "Date",
+    "Primary Type",
+    "Description",
+    "District",
+    "Ward",
+    "Community Area",
+    "Beat",
+    "Location Description",
+    "Arrest",
+    "Domestic",
+    "Latitude",
+    "Longitude",
+    "Year",
+    "Month",
+    "YearMonth",
+    "Weekday",
+    "Hour",
+    "GeomValid",
+]
+
+# Plain string columns (e.g. Description) become Arrow-backed strings instead of
+# Python objects. A blanket dtype_backend="pyarrow" would also turn the categorical
+# (dictionary) columns into ArrowDtype and lose the .cat accessor, so only strings are mapped.
+ARROW_STRING_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+def concat_years(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate per-year frames, keeping their categorical columns categorical."""
+    # Align categories across years, otherwise concat falls back to object dtype
+    for col in frames[0].select_dtypes("category").columns:
+        categories = union_categoricals([f[col] for f in frames], sort_categories=True).categories
+        frames = [f.assign(**{col: f[col].cat.set_categories(categories)}) for f in frames]
+
+    return pd.concat(frames, ignore_index=True, copy=False)
+
 @st.cache_data
 def load_year_data(year: int) -> pd.DataFrame:
     """Load data for a single year's crime file."""
     path = YEAR_TO_FILE[year]
-    df = pd.read_csv(path)
+    table = pq.read_table(path, columns=NEEDED_COLS)
+    df = table.to_pandas(types_mapper=ARROW_STRING_TYPES.get)
     return df
 
 @st.cache_data
-def load_multi_year_data(years: list[int]) -> pd.DataFrame:
-    """Load and concatenate multiple years and derive extra columns."""
-    frames = [load_year_data(y) for y in years]
-    df = pd.concat(frames, ignore_index=True)
-
-    # Parse dates and derive temporal features
-    if "Date" in df.columns:
-        if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
-            df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df["Year"] = df["Date"].dt.year
-        df["Month"] = df["Date"].dt.month
-        df["YearMonth"] = df["Date"].dt.to_period("M").dt.to_timestamp()
-        df["Weekday"] = df["Date"].dt.day_name()
-        df["Hour"] = df["Date"].dt.hour
-    else:
-        if "Year" in df.columns:
-            df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+def load_multi_year_data(years: tuple[int, ...]) -> pd.DataFrame:
+    """Load and concatenate multiple years."""
+    # The app passes a single year (HF constraint), which needs no concat at all
+    if len(years) == 1:
+        return load_year_data(years[0])
 
-    # Normalize some columns as string
-    for col in ["District", "Ward", "Community Area", "Beat"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str)
-
-    # Fill some known missing columns gracefully
-    for col in ["Arrest", "Domestic"]:
-        if col in df.columns:
-            df[col] = df[col].fillna(False)
+    df = concat_years([load_year_data(y) for y in years])
 
+    # Dtypes and the temporal features (Year, Month, YearMonth, Weekday, Hour)
+    # are already baked into the Parquet files
     return df
 
+# Columns offered as multiselect filters
+FILTER_COLS = [
+    "Primary Type",
+    "District",
+    "Ward",
+    "Community Area",
+    "Beat",
+    "Location Description",
+]
+
+@st.cache_data
+def get_filter_options(years: tuple[int, ...]) -> dict[str, list[str]]:
+    """Return the multiselect options per filter column for the selected years.
+
+    The filter columns are categoricals whose categories the converter stores
+    sorted (and concat_years keeps sorted), so the categories are the option
+    lists and no full-column unique() scan is needed.
+    """
+    df = load_multi_year_data(years)
+    return {
+        col: df[col].cat.categories.tolist() if col in df.columns else []
+        for col in FILTER_COLS
+    }
+
+# Dimensions of the per-year count cube used by the Overview and Crime Types tabs;
+# must match SUMMARY_DIMS in project/convert_to_parquet.py
+CUBE_DIMS = [
+    "Primary Type",
+    "District",
+    "YearMonth",
+    "Arrest",
+    "Domestic",
+    "Location Description",
+]
+
+# Pre-aggregated counts per combination of CUBE_DIMS, written by the converter
+SUMMARY_FILE = {year: f"project/data/summary_{year}.parquet" for year in YEAR_TO_FILE}
+
+def stop_if_data_missing(years: tuple[int, ...]) -> None:
+    """Stop the run with build instructions if a selected year's files are missing."""
+    paths = [path for year in years for path in (YEAR_TO_FILE[year], SUMMARY_FILE[year])]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        st.error(
+            "Missing data files: " + ", ".join(f"`{path}`" for path in missing) + ". "
+            "They are built from the per-year `project/data/Crimes_YYYY.csv` files by "
+            "running `python project/convert_to_parquet.py` from the repository root."
+        )
+        st.stop()
+
+# No spinner: the background warm-up (warm_summaries) calls this outside any
+# session, where a spinner has no page to draw on
+@st.cache_data(show_spinner=False)
+def load_summary(year: int) -> pd.DataFrame:
+    """Load a single year's incident count cube."""
+    return pq.read_table(SUMMARY_FILE[year]).to_pandas()
+
+@st.cache_data
+def load_cube(years: tuple[int, ...]) -> pd.DataFrame:
+    """Load the count cube for the selected years without touching the raw rows."""
+    if len(years) == 1:
+        return load_summary(years[0])
+    return concat_years([load_summary(y) for y in years])
+
+@st.cache_resource
+def warmup_executor() -> ThreadPoolExecutor:
+    """One small process-wide pool for background cache warm-up."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-warmup")
+
+@st.cache_resource
+def warm_summaries() -> list[Future]:
+    """Preload every year's count cube in the background, once per process.
+
+    The cubes are a few thousand rows each, so after a switch in the year
+    selectbox the Overview and Crime Types tabs are served from the cache.
+    The full rows are not preloaded: each year kept by load_year_data stays
+    in memory, the reason the app is single-year. The loads go through the
+    same st.cache_data entries a session uses, and their per-key locks stop
+    a session and the warm-up from reading one file twice.
+    """
+    pool = warmup_executor()
+    # Years whose cube is not built yet are left to stop_if_data_missing
+    return [
+        pool.submit(load_summary, year)
+        for year in YEAR_TO_FILE
+        if os.path.exists(SUMMARY_FILE[year])
+    ]
+
+def filter_mask(
+    df: pd.DataFrame,
+    column_filters: list[tuple[str, tuple[str, ...]]],
+    arrest_filter: str,
+    domestic_filter: str,
+) -> np.ndarray | None:
+    """Build the combined boolean mask of all active filters, or None if none is active."""
+    masks = []
+    for col, selected in column_filters:
+        if selected:
+            masks.append(df[col].isin(selected).to_numpy())
+
+    if arrest_filter != "All" and "Arrest" in df.columns:
+        masks.append(df["Arrest"].to_numpy() == (arrest_filter == "Only Arrests"))
+
+    if domestic_filter != "All" and "Domestic" in df.columns:
+        masks.append(df["Domestic"].to_numpy() == (domestic_filter == "Domestic Only"))
+
+    if not masks:
+        return None
+
+    # AND in place into the first mask (each is a fresh array); np.logical_and.reduce
+    # over the list would first stack all masks into a k x N array
+    mask = masks[0]
+    for other in masks[1:]:
+        mask &= other
+    return mask
+
+# cache_resource, not cache_data: every rerun and session with the same filters
+# shares one slice instead of each storing and unpickling a private copy (with no
+# filter, a whole year). Callers must treat the returned frame as read-only
+@st.cache_resource(max_entries=4)
+def apply_filters(
+    years: tuple[int, ...],
+    primary_types: tuple[str, ...],
+    districts: tuple[str, ...],
+    wards: tuple[str, ...],
+    community_areas: tuple[str, ...],
+    beats: tuple[str, ...],
+    locations: tuple[str, ...],
+    arrest_filter: str,
+    domestic_filter: str,
+) -> pd.DataFrame:
+    """Return the rows matching the global filters; empty selections keep everything."""
+    data = load_multi_year_data(years)
+
+    # Combine the masks and slice the frame only once
+    mask = filter_mask(
+        data,
+        [
+            ("Primary Type", primary_types),
+            ("District", districts),
+            ("Ward", wards),
+            ("Community Area", community_areas),
+            ("Beat", beats),
+            ("Location Description", locations),
+        ],
+        arrest_filter,
+        domestic_filter,
+    )
+    if mask is None:
+        return data
+    return data[mask]
+
+@st.cache_data(max_entries=32)
+def filtered_cube(
+    years: tuple[int, ...],
+    primary_types: tuple[str, ...],
+    districts: tuple[str, ...],
+    wards: tuple[str, ...],
+    community_areas: tuple[str, ...],
+    beats: tuple[str, ...],
+    locations: tuple[str, ...],
+    arrest_filter: str,
+    domestic_filter: str,
+) -> pd.DataFrame:
+    """Return the cube cells (with a Count column) matching the global filters.
+
+    Ward, Community Area and Beat are not cube dimensions, so when any of them
+    is selected the cube is rebuilt from the filtered rows instead.
+    """
+    if wards or community_areas or beats:
+        rows = apply_filters(
+            years, primary_types, districts, wards, community_areas, beats,
+            locations, arrest_filter, domestic_filter,
+        )
+        return rows.groupby(CUBE_DIMS, observed=True, dropna=False).size().reset_index(name="Count")
+
+    cube = load_cube(years)
+    mask = filter_mask(
+        cube,
+        [
+            ("Primary Type", primary_types),
+            ("District", districts),
+            ("Location Description", locations),
+        ],
+        arrest_filter,
+        domestic_filter,
+    )
+    if mask is None:
+        return cube
+    return cube[mask]
+
+# The scatter is drawn with deck.gl (WebGL), so it can show far more points than
+# an SVG chart; the cap now only bounds the JSON payload sent to the browser
+MAP_SAMPLE_SIZE = 10_000
+
+def downsample_for_map(lon: np.ndarray, lat: np.ndarray, n: int = MAP_SAMPLE_SIZE) -> np.ndarray:
+    """Return the sorted positions of about n points, stratified over a ~1 km lat/lon grid.
+
+    Each grid cell keeps a share of the sample proportional to its incident
+    count, with at least one point, so dense clusters keep their shape and
+    sparse areas do not vanish. The fixed seed keeps the map stable across reruns.
+    """
+    if len(lon) <= n:
+        return np.arange(len(lon))
+
+    # Shuffle positions rather than the rows themselves: only the kept points
+    # are ever copied out of the frame
+    shuffled = np.random.default_rng(42).permutation(len(lon))
+    cells = pd.DataFrame({
+        "lon": np.floor(lon[shuffled] * 100),
+        "lat": np.floor(lat[shuffled] * 100),
+    }).groupby(["lon", "lat"], sort=False)
+    rank = cells.cumcount().to_numpy()
+    quota = np.maximum(1, cells["lat"].transform("size").to_numpy() * n // len(lon))
+    return np.sort(shuffled[rank < quota])
+
+@st.cache_data(max_entries=32)
+def map_points(
+    years: tuple[int, ...],
+    primary_types: tuple[str, ...],
+    districts: tuple[str, ...],
+    wards: tuple[str, ...],
+    community_areas: tuple[str, ...],
+    beats: tuple[str, ...],
+    locations: tuple[str, ...],
+    arrest_filter: str,
+    domestic_filter: str,
+) -> pd.DataFrame:
+    """Return the sampled, geolocated rows plotted on the spatial scatter.
+
+    Returns crime_map.scatter_points() output: the crime_map.TOP_TYPES most
+    frequent types of the slice get their own colour group, the rest "Other".
+    """
+    rows = apply_filters(
+        years, primary_types, districts, wards, community_areas, beats,
+        locations, arrest_filter, domestic_filter,
+    )
+    located = np.flatnonzero(rows["GeomValid"].to_numpy())
+    keep = downsample_for_map(
+        rows["Longitude"].to_numpy()[located], rows["Latitude"].to_numpy()[located]
+    )
+    return crime_map.scatter_points(rows.take(located[keep]), crime_map.top_types(rows))
+
+MAP_DENSITY_BINS = 150
+
+@st.cache_data(max_entries=32)
+def map_density(
+    years: tuple[int, ...],
+    primary_types: tuple[str, ...],
+    districts: tuple[str, ...],
+    wards: tuple[str, ...],
+    community_areas: tuple[str, ...],
+    beats: tuple[str, ...],
+    locations: tuple[str, ...],
+    arrest_filter: str,
+    domestic_filter: str,
+) -> pd.DataFrame:
+    """Bin every geolocated filtered incident into a lat/lon grid of counts.
+
+    Unlike the scatter this uses all rows, and the browser only draws the
+    non-empty cells (at most MAP_DENSITY_BINS² rectangles).
+    """
+    rows = apply_filters(
+        years, primary_types, districts, wards, community_areas, beats,
+        locations, arrest_filter, domestic_filter,
+    )
+    coords = rows.loc[rows["GeomValid"].to_numpy(), ["Longitude", "Latitude"]]
+    counts, lon_edges, lat_edges = np.histogram2d(
+        coords["Longitude"].to_numpy(), coords["Latitude"].to_numpy(), bins=MAP_DENSITY_BINS
+    )
+    lon_idx, lat_idx = np.nonzero(counts)
+    return pd.DataFrame({
+        "lon_lo": lon_edges[lon_idx],
+        "lon_hi": lon_edges[lon_idx + 1],
+        "lat_lo": lat_edges[lat_idx],
+        "lat_hi": lat_edges[lat_idx + 1],
+        "Count": counts[lon_idx, lat_idx].astype("int64"),
+    })
+
+def month_run_counts(months: pd.Series) -> pd.Series:
+    """Count a sorted YearMonth column by run length, without hashing."""
+    values = months.to_numpy()
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return pd.Series(
+        np.diff(np.r_[starts, len(values)]),
+        index=pd.Index(values[starts], name=months.name),
+        name="count",
+    )
+
+# Columns whose per-value counts feed the Temporal and Spatial tab charts
+COUNT_COLS = ["Hour", "Weekday", "YearMonth", "Location Description"]
+
+@st.cache_data(max_entries=32)
+def chart_counts(
+    years: tuple[int, ...],
+    primary_types: tuple[str, ...],
+    districts: tuple[str, ...],
+    wards: tuple[str, ...],
+    community_areas: tuple[str, ...],
+    beats: tuple[str, ...],
+    locations: tuple[str, ...],
+    arrest_filter: str,
+    domestic_filter: str,
+) -> dict[str, pd.Series]:
+    """Return incident counts per value of each COUNT_COLS column of the filtered rows.
+
+    All four aggregates are built in one cached call, so a new filter selection
+    fetches the filtered rows once rather than once per chart, and reruns that
+    leave the filters unchanged reuse them without rescanning the rows.
+    """
+    rows = apply_filters(
+        years, primary_types, districts, wards, community_areas, beats,
+        locations, arrest_filter, domestic_filter,
+    )
+    counts = {}
+    for col in COUNT_COLS:
+        if col == "YearMonth" and rows[col].is_monotonic_increasing:
+            counts[col] = month_run_counts(rows[col])
+            continue
+        # value_counts is a single hash pass with no GroupBy object; on categoricals it
+        # also lists unused categories, which are dropped to match observed=True
+        col_counts = rows[col].value_counts(sort=False)
+        counts[col] = col_counts[col_counts > 0].sort_index()
+    return counts
+
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+@st.cache_resource
+def chart_templates() -> dict[str, alt.Chart]:
+    """Build the Temporal and Spatial tab Altair specs once, without data.
+
+    Each rerun only attaches the current aggregate with .properties(data=...),
+    a shallow copy, instead of rebuilding every mark, encoding and tooltip.
+    """
+    hour = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("Hour:O", title="Hour of Day (0–23)"),
+            y=alt.Y("Count:Q", title="Incidents"),
+            tooltip=[
+                alt.Tooltip("Hour:O", title="Hour"),
+                alt.Tooltip("Count:Q", title="Incidents", format=","),
+            ],
+        )
+        .properties(height=350)
+    )
+    weekday = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("Weekday:N", title="Day of Week", sort=DAY_ORDER),
+            y=alt.Y("Count:Q", title="Incidents"),
+            tooltip=[
+                alt.Tooltip("Weekday:N", title="Day"),
+                alt.Tooltip("Count:Q", title="Incidents", format=","),
+            ],
+        )
+        .properties(height=350)
+    )
+    month = (
+        alt.Chart()
+        .mark_line(point=True)
+        .encode(
+            x=alt.X("YearMonth:T", title="Month"),
+            y=alt.Y("Count:Q", title="Incidents"),
+            tooltip=[
+                alt.Tooltip("YearMonth:T", title="Month"),
+                alt.Tooltip("Count:Q", title="Incidents", format=","),
+            ],
+        )
+        .properties(height=350)
+    )
+    density = (
+        alt.Chart()
+        .mark_rect()
+        .encode(
+            x=alt.X("lon_lo:Q", title="Longitude", scale=alt.Scale(zero=False)),
+            x2="lon_hi:Q",
+            y=alt.Y("lat_lo:Q", title="Latitude", scale=alt.Scale(zero=False)),
+            y2="lat_hi:Q",
+            color=alt.Color("Count:Q", title="Incidents", scale=alt.Scale(scheme="blues", type="log")),
+            tooltip=[alt.Tooltip("Count:Q", title="Incidents", format=",")],
+        )
+        .properties(height=500)
+    )
+    locations = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("Count:Q", title="Incidents"),
+            y=alt.Y("Location Description:N", sort="-x", title="Location Description"),
+            tooltip=[
+                alt.Tooltip("Location Description:N", title="Location"),
+                alt.Tooltip("Count:Q", title="Incidents", format=","),
+            ],
+            color=alt.Color("Location Description:N", legend=None),
+        )
+        .properties(height=450)
+    )
+    return {
+        "hour": hour,
+        "weekday": weekday,
+        "month": month,
+        "density": density,
+        "locations": locations,
+    }
+
 # -------------------------
 # DOCUMENTATION EXPANDER
 # -------------------------
-with st.expander("Expert Documentation – How to Use This Dashboard?", expanded=True):
-    st.markdown("""
+# Kept as a module-level constant and rendered from a fragment, so the guide is
+# isolated from the filter and chart code below
+DOCS_MD = """
     ## Group Members  
     **Rohit Yadav**  
     **Pratyush Agarwal**  
@@ -282,10 +720,10 @@ with st.expander("Expert Documentation – How to Use This Dashboard?", expanded
       - `NARCOTICS` → specific districts or street segments
     ---
     ## 4. Spatial Analysis (Geographic Drill-Down)
-    A scatterplot map using Latitude/Longitude (sampled for performance).
+    A density grid of all incidents by Latitude/Longitude, or a WebGL map of individual incidents (up to 10,000 sampled points).
     Displays:
     - Exact location of incidents  
-    - Crime type (color-coded)  
+    - Crime type (color-coded for the five most frequent types, the rest as "Other")  
     - Tooltip: crime type, location, district, date  
     Enables:
     - Micro-hotspot detection  
@@ -356,14 +794,16 @@ with st.expander("Expert Documentation – How to Use This Dashboard?", expanded
     - Use the monthly series and crime-type breakdowns.
     ---
     ## 8. Technical Notes for Data Scientists
-    - Date column is parsed to extract:
+    - Date column is parsed once, when the Parquet files are built, to extract:
       - Year, Month, YearMonth
       - Weekday, Hour
-    - District, Ward, Community Area, Beat are standardized to string type.
+    - Crime type, location and geography columns (District, Ward, Community Area, Beat) are stored as
+      categoricals in per-year Parquet files, and Arrest/Domestic as booleans.
     - The dashboard uses:
       - **Altair** for charting (interactive, Vega-Lite)
       - **Streamlit** for UI, caching, and layout
     - Heavy operations (multi-year load) are cached with `@st.cache_data` for better performance.
+    - Overview and Crime Types charts are rolled up from a per-year count cube (crime type × district × month × arrest × domestic × location), pre-aggregated into `summary_YYYY.parquet`, instead of the raw rows.
     ---
     ## 9. Key Takeaways
     - The dashboard is built for:
@@ -378,7 +818,15 @@ with st.expander("Expert Documentation – How to Use This Dashboard?", expanded
     - Form hypotheses quickly
     - Validate or falsify intuitive explanations
     - Communicate findings with clear visual evidence.
-    """)
+    """
+
+@st.fragment
+def render_documentation() -> None:
+    """Render the expert usage guide inside a collapsible expander."""
+    with st.expander("Expert Documentation – How to Use This Dashboard?", expanded=True):
+        st.markdown(DOCS_MD)
+
+render_documentation()
 
 # -------------------------
 # FILTER BAR
@@ -448,39 +896,23 @@ with st.container():
 # So for the actual app logic we now always pass a **single-element list**:
 selected_years = [selected_year]
 
+stop_if_data_missing(tuple(selected_years))
+
 # Load data for selected years
 # Commenting this to add a new addition about bufferring. Since the data is large and sometimes it can take longer to render.
 # data = load_multi_year_data(selected_years)
 
 with st.spinner("Thank you for your patience! Loading and processing the requested data..."):
-    data = load_multi_year_data(selected_years)
+    filter_options = get_filter_options(tuple(selected_years))
 
-if "Primary Type" in data.columns:
-    primary_types = sorted(
-        data["Primary Type"].dropna().astype(str).unique().tolist()
-    )
-else:
-    primary_types = []
+# Queued after the selected year has loaded, so it never delays the first render
+warm_summaries()
 
-if "District" in data.columns:
-    district_vals = sorted(data["District"].dropna().astype(str).unique().tolist())
-else:
-    district_vals = []
-
-if "Ward" in data.columns:
-    ward_vals = sorted(data["Ward"].dropna().astype(str).unique().tolist())
-else:
-    ward_vals = []
-
-if "Community Area" in data.columns:
-    community_vals = sorted(data["Community Area"].dropna().astype(str).unique().tolist())
-else:
-    community_vals = []
-
-if "Beat" in data.columns:
-    beat_vals = sorted(data["Beat"].dropna().astype(str).unique().tolist())
-else:
-    beat_vals = []
+primary_types = filter_options["Primary Type"]
+district_vals = filter_options["District"]
+ward_vals = filter_options["Ward"]
+community_vals = filter_options["Community Area"]
+beat_vals = filter_options["Beat"]
 
 with col_primary:
     selected_primary_types = primary_types_placeholder.multiselect(
@@ -520,11 +952,7 @@ with st.container():
 
     with col_loc:
         st.markdown('<div class="filter-section-title">Location Description</div>', unsafe_allow_html=True)
-        loc_options = (
-            sorted(data["Location Description"].dropna().astype(str).unique().tolist())
-            if "Location Description" in data.columns
-            else []
-        )
+        loc_options = filter_options["Location Description"]
         selected_locations = st.multiselect(
             "Where did the incident occur?",
             options=loc_options,
@@ -552,39 +980,25 @@ with st.container():
 # -------------------------
 # APPLY FILTERS
 # -------------------------
-filtered = data.copy()
-
-if selected_primary_types:
-    filtered = filtered[filtered["Primary Type"].isin(selected_primary_types)]
-
-if selected_districts:
-    filtered = filtered[filtered["District"].isin(selected_districts)]
-
-if selected_wards:
-    filtered = filtered[filtered["Ward"].isin(selected_wards)]
-
-if selected_community:
-    filtered = filtered[filtered["Community Area"].isin(selected_community)]
-
-if selected_beats:
-    filtered = filtered[filtered["Beat"].isin(selected_beats)]
-
-if selected_locations:
-    filtered = filtered[filtered["Location Description"].isin(selected_locations)]
-
-if arrest_filter == "Only Arrests":
-    if "Arrest" in filtered.columns:
-        filtered = filtered[filtered["Arrest"] == True]
-elif arrest_filter == "Only Non-Arrests":
-    if "Arrest" in filtered.columns:
-        filtered = filtered[filtered["Arrest"] == False]
+# Streamlit reruns the whole script on every widget change, so the filtered
+# slice is cached per (year, filter selection). Selections are passed as sorted
+# tuples so they are hashable and order-insensitive.
+filter_key = (
+    tuple(selected_years),
+    tuple(sorted(selected_primary_types)),
+    tuple(sorted(selected_districts)),
+    tuple(sorted(selected_wards)),
+    tuple(sorted(selected_community)),
+    tuple(sorted(selected_beats)),
+    tuple(sorted(selected_locations)),
+    arrest_filter,
+    domestic_filter,
+)
+filtered = apply_filters(*filter_key)
 
-if domestic_filter == "Domestic Only":
-    if "Domestic" in filtered.columns:
-        filtered = filtered[filtered["Domestic"] == True]
-elif domestic_filter == "Non-Domestic Only":
-    if "Domestic" in filtered.columns:
-        filtered = filtered[filtered["Domestic"] == False]
+# Pre-aggregated counts for the same slice; the Overview and Crime Types
+# charts are rolled up from these cells instead of the raw rows
+cube = filtered_cube(*filter_key)
 
 # -------------------------
 # METRICS (TOP KPIs)
@@ -597,16 +1011,17 @@ c1, c2, c3, c4 = metric_cols
 total_crimes = len(filtered)
 
 if "Arrest" in filtered.columns and total_crimes > 0:
-    arrest_rate = 100 * filtered["Arrest"].mean()
+    # Arrest/Domestic are plain bool arrays, so the NumPy mean is a single pass
+    arrest_rate = 100 * filtered["Arrest"].to_numpy().mean()
 else:
     arrest_rate = None
 
 if "Domestic" in filtered.columns and total_crimes > 0:
-    domestic_share = 100 * filtered["Domestic"].mean()
+    domestic_share = 100 * filtered["Domestic"].to_numpy().mean()
 else:
     domestic_share = None
 
-if "Date" in filtered.columns and not filtered["Date"].isna().all():
+if "Date" in filtered.columns and filtered["Date"].notna().any():
     first_date = filtered["Date"].min()
     last_date = filtered["Date"].max()
 else:
@@ -639,7 +1054,9 @@ tab_overview, tab_types, tab_temporal, tab_spatial, tab_raw = st.tabs(
 # -------------------------
 # OVERVIEW TAB
 # -------------------------
-with tab_overview:
+@st.fragment
+def render_overview(filtered: pd.DataFrame, cube: pd.DataFrame) -> None:
+    """Render the Overview tab: top crime types, districts and the monthly trend."""
     st.markdown("#### Overview – Top Crime Types, Districts & Monthly Trend")
 
     if filtered.empty:
@@ -647,11 +1064,10 @@ with tab_overview:
     else:
         top_n = 15
         crime_by_type = (
-            filtered.groupby("Primary Type")
-            .size()
-            .reset_index(name="Count")
-            .sort_values("Count", ascending=False)
-            .head(top_n)
+            cube.groupby("Primary Type", observed=True, sort=False)["Count"]
+            .sum()
+            .nlargest(top_n)
+            .reset_index()
         )
 
         if not crime_by_type.empty:
@@ -673,12 +1089,12 @@ with tab_overview:
         col_left, col_right = st.columns(2)
 
         with col_left:
-            if "District" in filtered.columns and not filtered["District"].isna().all():
+            if "District" in cube.columns and not cube["District"].isna().all():
                 dist_counts = (
-                    filtered.groupby("District")
-                    .size()
-                    .reset_index(name="Count")
-                    .sort_values("Count", ascending=False)
+                    cube.groupby("District", observed=True, sort=False)["Count"]
+                    .sum()
+                    .sort_values(ascending=False)
+                    .reset_index()
                 )
                 dist_chart = (
                     alt.Chart(dist_counts)
@@ -698,12 +1114,12 @@ with tab_overview:
                 st.info("District data not available in this dataset slice.")
 
         with col_right:
-            if "YearMonth" in filtered.columns and not filtered["YearMonth"].isna().all():
+            if "YearMonth" in cube.columns and not cube["YearMonth"].isna().all():
+                # groupby already returns the months in sorted order
                 ym_counts = (
-                    filtered.groupby("YearMonth")
-                    .size()
-                    .reset_index(name="Count")
-                    .sort_values("YearMonth")
+                    cube.groupby("YearMonth", sort=True)["Count"]
+                    .sum()
+                    .reset_index()
                 )
                 line_chart = (
                     alt.Chart(ym_counts)
@@ -722,20 +1138,25 @@ with tab_overview:
             else:
                 st.info("Cannot build a monthly trend because 'Date' or 'YearMonth' is missing.")
 
+with tab_overview:
+    render_overview(filtered, cube)
+
 # -------------------------
 # CRIME TYPE TAB
 # -------------------------
-with tab_types:
+@st.fragment
+def render_crime_types(filtered: pd.DataFrame, cube: pd.DataFrame) -> None:
+    """Render the Crime Types tab: composition and location context."""
     st.markdown("#### Crime Type Composition & Location Context")
 
     if filtered.empty:
         st.warning("No data available for the selected filters.")
     else:
         type_counts = (
-            filtered.groupby("Primary Type")
-            .size()
-            .reset_index(name="Count")
-            .sort_values("Count", ascending=False)
+            cube.groupby("Primary Type", observed=True, sort=False)["Count"]
+            .sum()
+            .sort_values(ascending=False)
+            .reset_index()
         )
 
         col_bar, col_share = st.columns(2)
@@ -781,12 +1202,20 @@ with tab_types:
 
         st.markdown("---")
 
-        if "Location Description" in filtered.columns:
+        if "Location Description" in cube.columns:
             cross = (
-                filtered.groupby(["Primary Type", "Location Description"])
-                .size()
-                .reset_index(name="Count")
+                cube.groupby(["Primary Type", "Location Description"], observed=True, sort=False)["Count"]
+                .sum()
+                .reset_index()
             )
+            # Keep the chart readable and the payload small: only the most frequent
+            # crime types and locations are drawn, the long tail is dropped server-side
+            top_k = 15
+            top_types = cross.groupby("Primary Type", observed=True, sort=False)["Count"].sum().nlargest(top_k).index
+            top_locs = cross.groupby("Location Description", observed=True, sort=False)["Count"].sum().nlargest(top_k).index
+            cross = cross[
+                cross["Primary Type"].isin(top_types) & cross["Location Description"].isin(top_locs)
+            ]
             if not cross.empty:
                 cross_chart = (
                     alt.Chart(cross)
@@ -803,173 +1232,118 @@ with tab_types:
                     )
                     .interactive()
                 )
-                st.markdown("**Crime Type by Location Description**")
+                st.markdown(f"**Crime Type by Location Description (top {top_k} of each)**")
                 st.altair_chart(cross_chart.properties(height=450), use_container_width=True)
             else:
                 st.info("No cross-tab between crime type and location to show.")
         else:
             st.info("Location Description column not available.")
 
+with tab_types:
+    render_crime_types(filtered, cube)
+
 # -------------------------
 # TEMPORAL PATTERNS TAB
 # -------------------------
-with tab_temporal:
+@st.fragment
+def render_temporal(filtered: pd.DataFrame, filter_key: tuple) -> None:
+    """Render the Temporal Patterns tab: hour of day, weekday and monthly trend."""
     st.markdown("#### Temporal Patterns – Hour of Day, Day of Week, and Monthly Trends")
 
     if filtered.empty:
         st.warning("No data available for the selected filters.")
     else:
+        counts = chart_counts(*filter_key)
+        templates = chart_templates()
         col_hour, col_day = st.columns(2)
 
         with col_hour:
-            if "Hour" in filtered.columns:
-                hour_counts = (
-                    filtered.groupby("Hour")
-                    .size()
-                    .reset_index(name="Count")
-                    .sort_values("Hour")
-                )
-                if not hour_counts.empty:
-                    hour_chart = (
-                        alt.Chart(hour_counts)
-                        .mark_bar()
-                        .encode(
-                            x=alt.X("Hour:O", title="Hour of Day (0–23)"),
-                            y=alt.Y("Count:Q", title="Incidents"),
-                            tooltip=[
-                                alt.Tooltip("Hour:O", title="Hour"),
-                                alt.Tooltip("Count:Q", title="Incidents", format=","),
-                            ],
-                        )
-                    )
-                    st.markdown("**Incidents by Hour of Day**")
-                    st.altair_chart(hour_chart.properties(height=350), use_container_width=True)
-                else:
-                    st.info("No incidents with valid hour information.")
+            hour_counts = counts["Hour"].reset_index(name="Count")
+            if not hour_counts.empty:
+                hour_chart = templates["hour"].properties(data=hour_counts)
+                st.markdown("**Incidents by Hour of Day**")
+                st.altair_chart(hour_chart, use_container_width=True)
             else:
-                st.info("Hour information not available.")
+                st.info("No incidents with valid hour information.")
 
         with col_day:
-            if "Weekday" in filtered.columns:
-                day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                day_counts = (
-                    filtered.groupby("Weekday")
-                    .size()
-                    .reindex(day_order, fill_value=0)
-                    .reset_index(name="Count")
-                    .rename(columns={"index": "Weekday"})
-                )
-                day_chart = (
-                    alt.Chart(day_counts)
-                    .mark_bar()
-                    .encode(
-                        x=alt.X("Weekday:N", title="Day of Week", sort=day_order),
-                        y=alt.Y("Count:Q", title="Incidents"),
-                        tooltip=[
-                            alt.Tooltip("Weekday:N", title="Day"),
-                            alt.Tooltip("Count:Q", title="Incidents", format=","),
-                        ],
-                    )
-                )
-                st.markdown("**Incidents by Day of Week**")
-                st.altair_chart(day_chart.properties(height=350), use_container_width=True)
-            else:
-                st.info("Weekday information not available.")
+            day_counts = (
+                counts["Weekday"]
+                .reindex(DAY_ORDER, fill_value=0)
+                .reset_index(name="Count")
+                .rename(columns={"index": "Weekday"})
+            )
+            day_chart = templates["weekday"].properties(data=day_counts)
+            st.markdown("**Incidents by Day of Week**")
+            st.altair_chart(day_chart, use_container_width=True)
 
         st.markdown("---")
 
-        if "YearMonth" in filtered.columns:
-            ym_counts = (
-                filtered.groupby("YearMonth")
-                .size()
-                .reset_index(name="Count")
-                .sort_values("YearMonth")
-            )
-            if not ym_counts.empty:
-                line_chart = (
-                    alt.Chart(ym_counts)
-                    .mark_line(point=True)
-                    .encode(
-                        x=alt.X("YearMonth:T", title="Month"),
-                        y=alt.Y("Count:Q", title="Incidents"),
-                        tooltip=[
-                            alt.Tooltip("YearMonth:T", title="Month"),
-                            alt.Tooltip("Count:Q", title="Incidents", format=","),
-                        ],
-                    )
-                )
-                st.markdown("**Monthly Trend (Filtered Slice)**")
-                st.altair_chart(line_chart.properties(height=350), use_container_width=True)
-            else:
-                st.info("No monthly data points after filtering.")
+        ym_counts = counts["YearMonth"].reset_index(name="Count")
+        if not ym_counts.empty:
+            line_chart = templates["month"].properties(data=ym_counts)
+            st.markdown("**Monthly Trend (Filtered Slice)**")
+            st.altair_chart(line_chart, use_container_width=True)
         else:
-            st.info("No YearMonth information available.")
+            st.info("No monthly data points after filtering.")
+
+with tab_temporal:
+    render_temporal(filtered, filter_key)
 
 # -------------------------
 # SPATIAL / LOCATION TAB
 # -------------------------
-with tab_spatial:
+@st.fragment
+def render_spatial(filtered: pd.DataFrame, filter_key: tuple) -> None:
+    """Render the Spatial / Location tab: incident density or sampled map and top locations."""
     st.markdown("#### Spatial & Location-Based Patterns")
 
     if filtered.empty:
         st.warning("No data available for the selected filters.")
     else:
-        if {"Latitude", "Longitude"}.issubset(filtered.columns):
-            subset = filtered.dropna(subset=["Latitude", "Longitude"])
-            if len(subset) > 3000:
-                subset = subset.sample(3000, random_state=42)
-
-            if not subset.empty:
-                base = alt.Chart(subset).encode(
-                    x=alt.X("Longitude:Q", title="Longitude"),
-                    y=alt.Y("Latitude:Q", title="Latitude"),
-                    tooltip=[
-                        alt.Tooltip("Primary Type:N", title="Crime Type"),
-                        alt.Tooltip("Location Description:N", title="Location"),
-                        alt.Tooltip("District:N", title="District"),
-                        alt.Tooltip("Date:T", title="Date"),
-                    ],
-                )
-                points = base.mark_circle(size=10, opacity=0.4).encode(
-                    color=alt.Color("Primary Type:N", title="Crime Type", legend=None)
-                )
-                st.markdown("**Geospatial Scatter of Incidents (Sampled if Large)**")
-                st.altair_chart(points.properties(height=500), use_container_width=True)
-            else:
-                st.info("No valid latitude/longitude records in the filtered data.")
+        templates = chart_templates()
+        map_view = st.radio(
+            "Map view",
+            ["Density grid", "Sampled points"],
+            horizontal=True,
+            help="The density grid counts every incident; the scatter draws a sample of individual incidents.",
+        )
+        if map_view == "Density grid":
+            density = map_density(*filter_key)
         else:
-            st.info("Latitude/Longitude columns not present; spatial plotting not available.")
-
-        if "Location Description" in filtered.columns:
-            loc_counts = (
-                filtered.groupby("Location Description")
-                .size()
-                .reset_index(name="Count")
-                .sort_values("Count", ascending=False)
-                .head(20)
-            )
-            loc_chart = (
-                alt.Chart(loc_counts)
-                .mark_bar()
-                .encode(
-                    x=alt.X("Count:Q", title="Incidents"),
-                    y=alt.Y("Location Description:N", sort="-x", title="Location Description"),
-                    tooltip=[
-                        alt.Tooltip("Location Description:N", title="Location"),
-                        alt.Tooltip("Count:Q", title="Incidents", format=","),
-                    ],
-                    color=alt.Color("Location Description:N", legend=None),
-                )
-            )
-            st.markdown("**Top Locations by Incident Count**")
-            st.altair_chart(loc_chart.properties(height=450), use_container_width=True)
+            subset = map_points(*filter_key)
+
+        if map_view == "Density grid" and not density.empty:
+            density_chart = templates["density"].properties(data=density)
+            st.markdown("**Geospatial Density of Incidents**")
+            st.altair_chart(density_chart, use_container_width=True)
+        elif map_view == "Sampled points" and not subset.empty:
+            # WebGL scatter, one constant-colour layer per crime group
+            deck, legend = crime_map.scatter_deck(subset)
+            st.markdown("**Geospatial Scatter of Incidents (Sampled if Large)**")
+            st.markdown(legend, unsafe_allow_html=True)
+            st.pydeck_chart(deck, use_container_width=True, height=500)
         else:
-            st.info("Location Description column not found in the dataset.")
+            st.info("No valid latitude/longitude records in the filtered data.")
+
+        counts = chart_counts(*filter_key)
+        # nlargest partially sorts the ~200 location counts instead of sorting all of them
+        loc_counts = counts["Location Description"].nlargest(20).reset_index(name="Count")
+        loc_chart = templates["locations"].properties(data=loc_counts)
+        st.markdown("**Top Locations by Incident Count**")
+        st.altair_chart(loc_chart, use_container_width=True)
+
+with tab_spatial:
+    render_spatial(filtered, filter_key)
 
 # -------------------------
 # RAW DATA TAB
 # -------------------------
-with tab_raw:
+RAW_PAGE_SIZE = 500
+
+@st.fragment
+def render_raw(filtered: pd.DataFrame) -> None:
+    """Render the Raw Data tab with the filtered records."""
     st.markdown("#### Raw Data View")
 
     st.write(
@@ -977,10 +1351,29 @@ with tab_raw:
         "or to export data slices for offline analysis."
     )
 
-    st.dataframe(filtered, use_container_width=True, height=500)
+    # Only one page of rows is serialized to the browser instead of the whole slice
+    if len(filtered) > RAW_PAGE_SIZE:
+        offset = st.number_input(
+            f"Row offset (showing {RAW_PAGE_SIZE:,} of {len(filtered):,} rows)",
+            min_value=0,
+            max_value=len(filtered) - 1,
+            value=0,
+            step=RAW_PAGE_SIZE,
+        )
+    else:
+        offset = 0
+    st.dataframe(
+        filtered.iloc[offset:offset + RAW_PAGE_SIZE],
+        use_container_width=True,
+        height=500,
+        column_config={"GeomValid": None},  # internal helper column, not a record field
+    )
 
     st.markdown("**Note:** For very large slices, you may want to apply more filters to keep this table responsive.")
 
+with tab_raw:
+    render_raw(filtered)
+
 # -------------------------
 # COMMENTED-OUT / HISTORICAL CODE (KEPT FOR DOCUMENTATION)
 # -------------------------
@@ -1036,8 +1429,8 @@ st.markdown("""
 ### Appendix – Data Loading Design History (For Instructors / Reviewers)
 
 Over the course of this project, we iterated through multiple data-loading strategies.
-This section explains why the **final app** uses **single-year CSV files** instead of
-the Chicago Open Data API or multi-year simultaneous loads.
+This section explains why the **final app** uses **single-year Parquet files** (converted from the
+hosted per-year CSVs) instead of the Chicago Open Data API or multi-year simultaneous loads.
 
 #### **1. Initial Approach – Multi-Year Local CSVs**
 We started by:
@@ -1054,7 +1447,7 @@ We started by:
 
 #### **2. Optimized Multi-Year Loading with Caching**
 We refactored loading into:
-- `load_year_data(year)`: loads one CSV per year
+- `load_year_data(year)`: loads one file per year (a CSV at the time, the converted Parquet file today)
 - `load_multi_year_data(years)`: concatenates per-year data on demand
 - Added `@st.cache_data` so repeated requests for the same years reuse cached data
 
@@ -1097,9 +1490,15 @@ We attempted to fully replace uploaded CSVs by loading data directly from the of
   - Long cold-start times on initial API queries
   - Harder to guarantee reproducibility for grading/demonstration
 
-#### **6. Final Architecture – Hosted Per-Year CSVs**
+#### **6. Final Architecture – Hosted Per-Year CSVs, Converted to Parquet**
 Given the constraints, we settled on:
 - Hosting **2010–2020 per-year CSVs** within the project
+- Converting each one once, with `python project/convert_to_parquet.py` run from the repository root, into:
+  - `project/data/Crimes_YYYY.parquet` – typed columns (categoricals, booleans, float coordinates) plus
+    the derived Year, Month, YearMonth, Weekday and Hour, so no dates are parsed at load time
+  - `project/data/summary_YYYY.parquet` – a count cube (crime type × district × month × arrest × domestic × location)
+    that the Overview and Crime Types charts are rolled up from
+- Stopping with an error that names the converter when a selected year's Parquet files are missing
 - Restricting the user to **one selected year at a time**
 - Applying rich filters and visualizations **within that year**
 - Keeping `load_multi_year_data` general for future extension beyond HF Spaces
@@ -1123,6 +1522,6 @@ The current implementation balances:
 - reproducibility  
 
 under the constraints of HuggingFace Spaces.  
-Although the API-based architecture would be ideal in a scalable cloud environment, the hosted CSV
-solution provides the most consistent behavior for deployment on limited compute resources.
+Although the API-based architecture would be ideal in a scalable cloud environment, the hosted
+per-year file solution provides the most consistent behavior for deployment on limited compute resources.
 """)
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import requests
+import io
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from datetime import datetime
 
 st.set_page_config(
@@ -35,12 +38,17 @@ def load_year_data(year):
     Returns a pandas DataFrame.
     """
 
-    # Very high limit to avoid Chicago default 1000 row cap
-    limit = 50000000
+    # Real cap above the largest year (~486k rows in 2001), instead of the old
+    # 50M placeholder; it still overrides the portal's default 1000-row page
+    limit = 1_000_000
 
+    # CSV export with server-side projection: only the columns the tabs use
+    # are sent, and pyarrow parses them straight into typed columns instead of
+    # building a Python dict per record from JSON
     api_url = (
-        "https://data.cityofchicago.org/resource/ijzp-q8t2.json"
-        f"?$limit={limit}"
+        "https://data.cityofchicago.org/resource/ijzp-q8t2.csv"
+        "?$select=date,primary_type,latitude,longitude"
+        f"&$limit={limit}"
         f"&$where=year={year}"
     )
 
@@ -50,16 +58,28 @@ def load_year_data(year):
         st.error(f"Failed to fetch data for {year}. API Error: {response.status_code}")
         return pd.DataFrame()
 
-    df = pd.DataFrame(response.json())
+    table = pacsv.read_csv(
+        io.BytesIO(response.content),
+        convert_options=pacsv.ConvertOptions(
+            column_types={
+                "primary_type": pa.dictionary(pa.int32(), pa.string()),
+                "latitude": pa.float64(),
+                "longitude": pa.float64(),
+            },
+        ),
+    )
+    df = table.to_pandas()
 
-    # Basic cleaning
-    if not df.empty:
-        if "latitude" in df.columns and "longitude" in df.columns:
-            df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
-            df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+    if len(df) >= limit:
+        st.warning(f"Only the first {limit:,} records for {year} were loaded.")
 
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    # Basic cleaning (latitude/longitude already arrive as floats)
+    if not df.empty:
+        # pyarrow already yields timestamps for ISO dates; otherwise parse with
+        # the API's ISO 8601 format pinned instead of inferring it per row, and
+        # cache=True to parse each repeated timestamp string once
+        if "date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+            df["date"] = pd.to_datetime(df["date"], format="ISO8601", cache=True, errors="coerce")
 
     return df
 
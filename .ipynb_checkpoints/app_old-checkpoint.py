@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import altair as alt
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import colorsys
 
-# Disable Altair row limit so multi-year data doesn't silently break
-alt.data_transformers.disable_max_rows()
+# Shared with app.py: the sampled scatter's grouping, colours and deck.gl layers
+import crime_map
 
 # -------------------------
 # PAGE CONFIG
@@ -105,55 +110,590 @@ st.caption("IS445 • Expert-facing Streamlit dashboard for exploring Chicago cr
 # DATA LOADING
 # -------------------------
 
+# Per-year Parquet files are produced once from the CSVs by project/convert_to_parquet.py
 YEAR_TO_FILE = {
-    year: f"project/data/Crimes_{year}.csv"
+    year: f"project/data/Crimes_{year}.parquet"
     for year in range(2010, 2021)  # 2010–2020 inclusive on HuggingFace
 }
 
-@st.cache_data
-def load_year_data(year: int) -> pd.DataFrame:
-    """Load data for a single year's crime file."""
-    path = YEAR_TO_FILE[year]
-    df = pd.read_csv(path)
-    return df
+# Only the columns the filters, charts and map use are kept in the shared frame
+NEEDED_COLS = [
+    "Date",
+    "Primary Type",
+    "District",
+    "Location Description",
+    "Arrest",
+    "Domestic",
+    "Latitude",
+    "Longitude",
+    # Temporal features derived once by the converter rather than on every load
+    "YearMonth",
+    "Weekday",
+    "Hour",
+]
+
+# Columns only the "Preview Filtered Data" table shows. They are read from the
+# Parquet files for the previewed rows alone (see preview_rows), so Description,
+# one string per incident, never sits in the shared frame
+PREVIEW_ONLY_COLS = ["Description", "Ward", "Community Area", "Beat", "Year", "Month"]
+
+# Column order of the preview table
+PREVIEW_COLS = [
+    "Date",
+    "Primary Type",
+    "Description",
+    "District",
+    "Ward",
+    "Community Area",
+    "Beat",
+    "Location Description",
+    "Arrest",
+    "Domestic",
+    "Latitude",
+    "Longitude",
+    "Year",
+    "Month",
+    "YearMonth",
+    "Weekday",
+    "Hour",
+]
+
+# Plain string columns (Description) become Arrow-backed strings instead of
+# Python objects. A blanket dtype_backend="pyarrow"
+# would also turn the categorical (dictionary) columns into ArrowDtype and lose
+# the .cat accessor the filters use.
+ARROW_STRING_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
 
-@st.cache_data
-def load_multi_year_data(years: list[int]) -> pd.DataFrame:
-    """Load and concatenate multiple years and derive extra columns."""
-    frames = [load_year_data(y) for y in years]
-    df = pd.concat(frames, ignore_index=True)
-
-    # Parse dates and derive temporal features
-    if "Date" in df.columns:
-        if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
-            df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df["Year"] = df["Date"].dt.year
-        df["Month"] = df["Date"].dt.month
-        df["YearMonth"] = df["Date"].dt.to_period("M").dt.to_timestamp()
-        df["Weekday"] = df["Date"].dt.day_name()
-        df["Hour"] = df["Date"].dt.hour
-    else:
-        if "Year" in df.columns:
-            df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
-
-    # Normalize some columns as string
-    for col in ["District", "Ward", "Community Area", "Beat"]:
-        if col in df.columns:
-            df[col] = df[col].astype("string")
-
-    # Normalize Arrest/Domestic flags
-    for flag_col in ["Arrest", "Domestic"]:
-        if flag_col in df.columns:
-            df[flag_col] = (
-                df[flag_col]
-                .astype(str)
-                .str.strip()
-                .str.upper()
-                .isin(["TRUE", "T", "1", "YES", "Y"])
-            )
+# Per-year incident count cubes (Primary Type x District x YearMonth x Arrest x
+# Domestic x Location Description), written by project/convert_to_parquet.py
+SUMMARY_FILE = {year: f"project/data/summary_{year}.parquet" for year in YEAR_TO_FILE}
+
+def stop_if_data_missing(years: tuple[int, ...]) -> None:
+    """Stop the run with build instructions if a selected year's files are missing."""
+    paths = [path for year in years for path in (YEAR_TO_FILE[year], SUMMARY_FILE[year])]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        st.error(
+            "Missing data files: " + ", ".join(f"`{path}`" for path in missing) + ". "
+            "They are built from the per-year `project/data/Crimes_YYYY.csv` files by "
+            "running `python project/convert_to_parquet.py` from the repository root."
+        )
+        st.stop()
+
+# The loaders use cache_resource: every session and rerun shares one frame
+# instead of unpickling a private copy, so callers must never modify the frames
+# they return (filters slice, aggregations build new frames)
+@st.cache_resource(max_entries=4)
+def load_summary(years: tuple[int, ...]) -> pd.DataFrame:
+    """Load the incident count cubes of the selected years (a few thousand rows each)."""
+    return pq.read_table([SUMMARY_FILE[y] for y in years]).to_pandas()
+
+def read_years(years: tuple[int, ...]) -> pd.DataFrame:
+    """Read the selected years as one typed table, ready for filtering."""
+    # One multi-file Arrow read instead of a frame per year plus pd.concat; the
+    # categoricals' dictionaries are unified across files on conversion
+    table = pq.read_table([YEAR_TO_FILE[y] for y in years], columns=NEEDED_COLS)
+    # One block per column (no consolidation copy), and each Arrow column is
+    # released as soon as it is converted, so the table and the frame are never
+    # both fully in memory
+    df = table.to_pandas(
+        types_mapper=ARROW_STRING_TYPES.get, split_blocks=True, self_destruct=True
+    )
+    del table
+
+    # Low-cardinality codes and labels as categoricals: int-code isin/groupby and
+    # a fraction of the memory. The Parquet files already store them this way.
+    to_category = {
+        col: "category"
+        for col in ["District", "Primary Type", "Location Description"]
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    if to_category:
+        df = df.astype(to_category)
 
     return df
 
+# Memory bound of the shared row frames: the last 3 single years plus the last
+# multi-year selection. A multi-year frame is as large as all its years
+# together, so only one is kept; a new selection replaces it.
+# show_spinner=False: the caller already wraps the load in its own spinner message
+@st.cache_resource(max_entries=3, show_spinner=False)
+def load_year_data(year: int) -> pd.DataFrame:
+    """Load a single year's rows."""
+    return read_years((year,))
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_years_combined(years: tuple[int, ...]) -> pd.DataFrame:
+    """Load several years' rows as one frame, in one multi-file read."""
+    return read_years(years)
+
+def load_multi_year_data(years: tuple[int, ...]) -> pd.DataFrame:
+    """Load the selected years, from the single-year cache when only one is selected."""
+    if len(years) == 1:
+        return load_year_data(years[0])
+    return load_years_combined(years)
+
+def isin_mask(col: pd.Series, values: tuple) -> np.ndarray:
+    """Boolean mask of the rows whose value is in values."""
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        return col.isin(values).to_numpy()
+    # Mark the selected categories in a lookup table and gather it by code;
+    # the extra trailing False slot is what code -1 (missing) picks up
+    hit = np.zeros(len(col.cat.categories) + 1, dtype=bool)
+    wanted = col.cat.categories.get_indexer(list(values))
+    hit[wanted[wanted >= 0]] = True
+    return hit[col.cat.codes.to_numpy()]
+
+def filter_rows(
+    df: pd.DataFrame, pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> pd.DataFrame:
+    """Apply the top-bar filters; an empty key leaves that column unfiltered."""
+    # One mask per active filter, ANDed in place and used to slice the frame
+    # once; with no active filter the cached frame is returned as is (nothing
+    # downstream mutates it)
+    masks = []
+    if pt_key:
+        masks.append(isin_mask(df["Primary Type"], pt_key))
+    if district_key:
+        masks.append(isin_mask(df["District"], district_key))
+    if loc_key:
+        masks.append(isin_mask(df["Location Description"], loc_key))
+
+    if not masks:
+        return df
+    # np.logical_and.reduce over the list would first stack all masks into a k x N array
+    mask = masks[0]
+    for other in masks[1:]:
+        mask &= other
+    return df[mask]
+
+@st.cache_data(max_entries=16)
+def count_cube(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> pd.Series:
+    """Incident counts per (Primary Type, District, YearMonth) for one filter combination."""
+    # The top-bar filters are all cube dimensions, so filtering and summing the
+    # precomputed cube gives the same counts as grouping the raw rows.
+    # dropna=False keeps incidents with a missing District in the driver counts;
+    # the marginals drop missing keys like the per-plot groupbys did.
+    cube = filter_rows(load_summary(years), pt_key, district_key, loc_key)
+    return (
+        cube.groupby(["Primary Type", "District", "YearMonth"], observed=True, dropna=False)["Count"]
+        .sum()
+    )
+
+@st.cache_data(max_entries=16)
+def compute_aggregates(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple, picked_key: tuple = ()
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame | None]:
+    """Driver, district and monthly-trend counts for one filter combination.
+
+    The driven frames are restricted to the crime types picked in the driver
+    plot (all types when picked_key is empty); the district counts are summed
+    over those types, so the browser gets one row per district.
+    """
+    crime_counts = count_cube(years, pt_key, district_key, loc_key)
+
+    driver_df = (
+        crime_counts
+        .groupby(level="Primary Type", observed=True)
+        .sum()
+        .reset_index(name="Crime Count")
+    )
+
+    if picked_key:
+        types = crime_counts.index.get_level_values("Primary Type")
+        crime_counts = crime_counts[types.isin(picked_key)]
+
+    district_df = (
+        crime_counts
+        .groupby(level="District", observed=True)
+        .sum()
+        .reset_index(name="Crime Count")
+    )
+    trend_df = (
+        crime_counts
+        .groupby(level=["YearMonth", "Primary Type"], observed=True)
+        .sum()
+        .reset_index(name="Crime Count")
+    ) if "YearMonth" in crime_counts.index.names else None
+    return driver_df, district_df, trend_df
+
+@st.cache_data(max_entries=16)
+def compute_arrest_rates(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> pd.DataFrame:
+    """Share of incidents with an arrest per Primary Type, from the count cube."""
+    cube = filter_rows(load_summary(years), pt_key, district_key, loc_key)
+    types = cube["Primary Type"]
+    codes = types.cat.codes.to_numpy()
+    known = codes >= 0
+    counts = cube["Count"].to_numpy()
+    n_types = len(types.cat.categories)
+    # Incident and arrest totals per category code in two C-level bincount passes
+    totals = np.bincount(codes[known], weights=counts[known], minlength=n_types)
+    arrests = np.bincount(
+        codes[known], weights=(counts * cube["Arrest"].to_numpy())[known], minlength=n_types
+    )
+    present = totals > 0
+    return pd.DataFrame({
+        "Primary Type": types.cat.categories[present],
+        "Arrest Rate": arrests[present] / totals[present],
+    })
+
+@st.cache_data(max_entries=16)
+def compute_summary_metrics(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> tuple[int, float | None, float | None, pd.Timestamp | None, pd.Timestamp | None]:
+    """Total incidents, arrest and domestic shares (%) and the month span, from the count cube."""
+    cube = filter_rows(load_summary(years), pt_key, district_key, loc_key)
+    counts = cube["Count"].to_numpy()
+    total = int(counts.sum())
+    if not total:
+        return 0, None, None, None, None
+    # Each cube row stands for Count incidents, so the shares are Count-weighted means
+    arrest_rate = (
+        (counts * cube["Arrest"].to_numpy()).sum() / total * 100
+        if "Arrest" in cube.columns else None
+    )
+    domestic_share = (
+        (counts * cube["Domestic"].to_numpy()).sum() / total * 100
+        if "Domestic" in cube.columns else None
+    )
+    if "YearMonth" in cube.columns:
+        first_date, last_date = cube["YearMonth"].min(), cube["YearMonth"].max()
+    else:
+        first_date = last_date = None
+    return total, arrest_rate, domestic_share, first_date, last_date
+
+@st.cache_data(max_entries=16)
+def compute_time_counts(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
+    """Incident counts by hour of day and by weekday for one filter combination."""
+    filtered = filter_rows(load_multi_year_data(years), pt_key, district_key, loc_key)
+    hour_df = (
+        filtered.groupby("Hour", observed=True).size().reset_index(name="Crime Count")
+        if "Hour" in filtered.columns else None
+    )
+    weekday_df = (
+        filtered.groupby("Weekday", observed=True).size().reset_index(name="Crime Count")
+        if "Weekday" in filtered.columns else None
+    )
+    return hour_df, weekday_df
+
+# Grid resolution of the spatial density map (cells per axis)
+DENSITY_BINS = 150
+
+@st.cache_data(max_entries=16)
+def compute_density(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> pd.DataFrame:
+    """Bin every geolocated incident of one filter combination into a lat/lon grid.
+
+    Each non-empty cell carries its incident count and most frequent crime type,
+    so the browser draws at most DENSITY_BINS² rectangles whatever the row count.
+    """
+    filtered = filter_rows(load_multi_year_data(years), pt_key, district_key, loc_key)
+    located = filtered.dropna(subset=["Latitude", "Longitude"])
+    if located.empty:
+        return pd.DataFrame(columns=["lon_lo", "lon_hi", "lat_lo", "lat_hi", "Count", "Top Type"])
+
+    lon = located["Longitude"].to_numpy()
+    lat = located["Latitude"].to_numpy()
+    lon_edges = np.histogram_bin_edges(lon, bins=DENSITY_BINS)
+    lat_edges = np.histogram_bin_edges(lat, bins=DENSITY_BINS)
+    # Same cell assignment as np.histogram2d (the last edge is inclusive)
+    lon_idx = np.clip(np.searchsorted(lon_edges, lon, side="right") - 1, 0, DENSITY_BINS - 1)
+    lat_idx = np.clip(np.searchsorted(lat_edges, lat, side="right") - 1, 0, DENSITY_BINS - 1)
+
+    by_type = (
+        pd.DataFrame({
+            "Cell": lon_idx * DENSITY_BINS + lat_idx,
+            "Primary Type": located["Primary Type"].to_numpy(),
+        })
+        .groupby(["Cell", "Primary Type"], observed=True)
+        .size()
+    )
+    counts = by_type.groupby(level="Cell").sum()
+    top_type = by_type.groupby(level="Cell").idxmax().str[1]
+
+    cells = counts.index.to_numpy()
+    cell_lon, cell_lat = np.divmod(cells, DENSITY_BINS)
+    return pd.DataFrame({
+        "lon_lo": lon_edges[cell_lon],
+        "lon_hi": lon_edges[cell_lon + 1],
+        "lat_lo": lat_edges[cell_lat],
+        "lat_hi": lat_edges[cell_lat + 1],
+        "Count": counts.to_numpy(),
+        "Top Type": top_type.reindex(cells).astype(str).to_numpy(),
+    })
+
+# Points drawn by the sampled scatter (grouped, formatted and drawn by crime_map)
+SAMPLE_SIZE = 5000
+# Every crime type keeps at least this many points (or all of them, if fewer),
+# so rare types such as HOMICIDE still show up on the scatter
+SAMPLE_MIN_PER_TYPE = 10
+
+@st.cache_data(max_entries=16)
+def compute_sample(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> pd.DataFrame:
+    """Sample about SAMPLE_SIZE geolocated incidents, stratified by Primary Type.
+
+    Returns crime_map.scatter_points() output: the crime_map.TOP_TYPES most
+    frequent types of the slice get their own colour group, the rest "Other".
+    """
+    filtered = filter_rows(load_multi_year_data(years), pt_key, district_key, loc_key)
+    # Draw row positions from the geolocated mask and take only those rows,
+    # instead of copying every geolocated row with dropna() and sampling that
+    located = np.flatnonzero(
+        filtered["Latitude"].notna().to_numpy() & filtered["Longitude"].notna().to_numpy()
+    )
+    if len(located) > SAMPLE_SIZE:
+        # One shuffle, then keep the first `quota` rows of each type in shuffled
+        # order: a proportional share of SAMPLE_SIZE, floored at SAMPLE_MIN_PER_TYPE
+        shuffled = np.random.default_rng(42).permutation(located)
+        codes = filtered["Primary Type"].cat.codes.to_numpy()[shuffled] + 1  # 0 = missing
+        sizes = np.bincount(codes)
+        quota = np.maximum(SAMPLE_MIN_PER_TYPE, sizes * SAMPLE_SIZE // len(shuffled))
+        rank = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+        located = np.sort(shuffled[rank < quota[codes]])
+    return crime_map.scatter_points(filtered.take(located), crime_map.top_types(filtered))
+
+# Rows shown by the "Preview Filtered Data" expander, and how many rows each
+# scan step of preview_rows filters at a time
+PREVIEW_ROWS = 100
+PREVIEW_BLOCK = 50_000
+
+@st.cache_data(max_entries=16)
+def preview_rows(
+    years: tuple[int, ...], pt_key: tuple, district_key: tuple, loc_key: tuple
+) -> pd.DataFrame:
+    """The first PREVIEW_ROWS incidents of one filter combination, all columns.
+
+    Filters the cached frame one PREVIEW_BLOCK slice at a time and stops once
+    enough rows match, instead of masking and slicing every row for a preview;
+    the PREVIEW_ONLY_COLS are then read from disk for just those rows.
+    """
+    df = load_multi_year_data(years)
+    parts, found = [], 0
+    for start in range(0, len(df), PREVIEW_BLOCK):
+        # iloc slices are views, so nothing is copied until the matches are taken
+        part = filter_rows(df.iloc[start:start + PREVIEW_BLOCK], pt_key, district_key, loc_key)
+        if len(part):
+            parts.append(part.head(PREVIEW_ROWS - found))
+            found += len(parts[-1])
+        if found >= PREVIEW_ROWS:
+            break
+    preview = pd.concat(parts) if parts else df.iloc[:0]
+
+    # The frame's index is the row position across the selected years' files, in
+    # read order, so each row's file and offset in it follow from the row counts
+    positions = preview.index.to_numpy()
+    row_counts = [pq.read_metadata(YEAR_TO_FILE[y]).num_rows for y in years]
+    starts = np.cumsum([0] + row_counts)
+    extra = []
+    for year, lo, hi in zip(years, starts[:-1], starts[1:]):
+        local = positions[(positions >= lo) & (positions < hi)] - lo
+        if len(local):
+            extra.append(pq.read_table(YEAR_TO_FILE[year], columns=PREVIEW_ONLY_COLS).take(local))
+    if extra:
+        extra_df = pa.concat_tables(extra).to_pandas(types_mapper=ARROW_STRING_TYPES.get)
+        preview = preview.assign(**extra_df.set_axis(preview.index))
+    return preview.reindex(columns=PREVIEW_COLS)
+
+def category_values(df: pd.DataFrame, col: str) -> list[str]:
+    """Distinct values of a column as strings, read off the categories when possible."""
+    if col not in df.columns:
+        return []
+    if isinstance(df[col].dtype, pd.CategoricalDtype):
+        # O(categories) rather than a unique() scan over every row
+        return df[col].cat.categories.astype(str).tolist()
+    return df[col].dropna().astype(str).unique().tolist()
+
+@st.cache_data(max_entries=16)
+def option_lists(years: tuple[int, ...]) -> tuple[list[str], list[str], list[str]]:
+    """Sorted multiselect options (primary types, districts, locations) for the selected years."""
+    df = load_multi_year_data(years)
+
+    # Sort districts in chronological/numeric order but keep them as strings
+    district_vals = category_values(df, "District")
+    try:
+        districts = sorted(district_vals, key=lambda x: int(float(x)))
+    except Exception:
+        districts = sorted(district_vals)
+
+    return (
+        sorted(category_values(df, "Primary Type")),
+        districts,
+        sorted(category_values(df, "Location Description")),
+    )
+
+# Weekday axis order; matches the categories the converter gives the Weekday column
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Vega's "tableau20" colours; primary_type_scale extends them when the year has more types
+TYPE_PALETTE = [
+    "#4c78a8", "#9ecae9", "#f58518", "#ffbf79", "#54a24b",
+    "#88d27a", "#b79a20", "#f2cf5b", "#439894", "#83bcb6",
+    "#e45756", "#ff9d98", "#79706e", "#bab0ac", "#d67195",
+    "#fcbfd2", "#b279a2", "#d6a5c9", "#9e765f", "#d8b5a5",
+]
+
+@st.cache_resource(max_entries=4)
+def primary_type_scale(primary_types: tuple[str, ...]) -> alt.Scale:
+    """Colour scale over every Primary Type of the selected years.
+
+    A fixed domain gives each type the same colour in the driver and trend
+    plots, whatever the filters or the pick leave in the data. The range has
+    one colour per type (a named scheme would wrap after 20 and give two
+    types one colour): TYPE_PALETTE, then golden-ratio spaced hues.
+    """
+    extra = len(primary_types) - len(TYPE_PALETTE)
+    generated = [
+        colorsys.hsv_to_rgb((0.11 + i * 0.618034) % 1, 0.6, 0.85 - 0.2 * (i % 2))
+        for i in range(max(extra, 0))
+    ]
+    colors = TYPE_PALETTE + [
+        "#{:02x}{:02x}{:02x}".format(*(round(c * 255) for c in rgb)) for rgb in generated
+    ]
+    return alt.Scale(domain=list(primary_types), range=colors[:len(primary_types)])
+
+@st.cache_resource(max_entries=4)
+def chart_templates(primary_types: tuple[str, ...]) -> dict[str, alt.Chart]:
+    """The Crime Overview and Temporal & Arrest Patterns charts, without data.
+
+    Keyed on the selected years' Primary Types because the driver plot's
+    colour scale covers all of them. The driver spec carries its "driver_pick"
+    selection. Reruns only attach the current aggregate with
+    .properties(data=...). st.altair_chart still serialises the whole spec on
+    every render; what is saved is rebuilding the marks, encodings, scale and
+    selection each time.
+    """
+    # The pick is sent back to Python, which re-aggregates the driven plots
+    # for the chosen types instead of shipping per-type rows to the browser
+    selection = alt.selection_point(name="driver_pick", fields=["Primary Type"])
+    driver = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("Primary Type:N", sort="-y", title="Primary Crime Type"),
+            y=alt.Y("Crime Count:Q", title="Number of Crimes"),
+            color=alt.condition(
+                selection,
+                alt.Color("Primary Type:N", legend=None, scale=primary_type_scale(primary_types)),
+                alt.value("lightgray")
+            ),
+            tooltip=[
+                alt.Tooltip("Primary Type:N", title="Primary Type"),
+                alt.Tooltip("Crime Count:Q", title="Number of Crimes")
+            ]
+        )
+        .add_params(selection)
+        .properties(
+            width=900,
+            height=300,
+            title="Driver Plot – Crime Counts by Primary Type"
+        )
+    )
+    district = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("District:N", title="Police District"),
+            y=alt.Y("Crime Count:Q", title="Number of Crimes"),
+            color=alt.Color("District:N", title="District"),
+            tooltip=[
+                alt.Tooltip("District:N", title="District"),
+                alt.Tooltip("Crime Count:Q", title="Number of Crimes")
+            ]
+        )
+        .properties(
+            width=900,
+            height=300,
+            title="Driven Plot 1 – Crimes by District (for selected Primary Types)"
+        )
+    )
+    trend = (
+        alt.Chart()
+        .mark_line(point=True)
+        .encode(
+            x=alt.X("YearMonth:T", title="Year-Month"),
+            y=alt.Y("Crime Count:Q", title="Number of Crimes"),
+            # colour is bound per rerun, so its legend lists only the drawn types
+            tooltip=[
+                alt.Tooltip("YearMonth:T", title="Year-Month"),
+                alt.Tooltip("Primary Type:N", title="Primary Type"),
+                alt.Tooltip("Crime Count:Q", title="Number of Crimes")
+            ]
+        )
+        .properties(
+            width=900,
+            height=300,
+            title="Driven Plot 2 – Monthly Trend (for selected Primary Types)"
+        )
+    )
+    hour = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("Hour:O", title="Hour of Day"),
+            y=alt.Y("Crime Count:Q", title="Number of Crimes"),
+            tooltip=[
+                alt.Tooltip("Hour:O", title="Hour"),
+                alt.Tooltip("Crime Count:Q", title="Number of Crimes")
+            ]
+        )
+        .properties(
+            width=350,
+            height=300
+        )
+    )
+    weekday = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("Weekday:N", sort=DAY_ORDER, title="Day of Week"),
+            y=alt.Y("Crime Count:Q", title="Number of Crimes"),
+            tooltip=[
+                alt.Tooltip("Weekday:N", title="Day"),
+                alt.Tooltip("Crime Count:Q", title="Number of Crimes")
+            ]
+        )
+        .properties(
+            width=350,
+            height=300
+        )
+    )
+    arrest = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X("Primary Type:N", sort="-y", title="Primary Crime Type"),
+            y=alt.Y("Arrest Rate:Q", title="Arrest Rate", axis=alt.Axis(format="%")),
+            tooltip=[
+                alt.Tooltip("Primary Type:N", title="Primary Type"),
+                alt.Tooltip("Arrest Rate:Q", title="Arrest Rate", format=".1%")
+            ]
+        )
+        .properties(
+            width=900,
+            height=350
+        )
+    )
+    return {
+        "driver": driver,
+        "district": district,
+        "trend": trend,
+        "hour": hour,
+        "weekday": weekday,
+        "arrest": arrest,
+    }
+
 # -------------------------
 # REQUIRED WRITE-UP
 # -------------------------
@@ -222,7 +762,7 @@ with st.expander("Expert Documentation – How to Use This Dashboard?", expanded
     This is the **core analytical dashboard**.
     ### **Driver Plot – Crime Counts by Primary Type**
     - Click a crime type to activate cross-filtering.
-    - Ctrl/Cmd-click to choose multiple crime types.
+    - Shift-click to choose multiple crime types; double-click clears the selection.
     - This selection drives the two charts below.
     **What experts use it for:**
     - Identify top crimes in your filtered period.
@@ -250,11 +790,13 @@ with st.expander("Expert Documentation – How to Use This Dashboard?", expanded
     - How they behave over time  
     ---
     ## 4. Spatial Analysis (Geographic Drill-Down)
-    A scatterplot map using Latitude/Longitude (sampled for performance).
+    A Latitude/Longitude map with two views:
+    - **Density grid** (default): every geolocated incident counted into a grid cell  
+    - **Sampled points**: a scatter of individual incidents (sampled for performance)  
     Displays:
-    - Exact location of incidents  
-    - Crime type (color-coded)  
-    - Tooltip: crime type, location, district, date  
+    - Exact location of incidents (sampled points)  
+    - Crime type (color-coded: the five most frequent types, grey for the rest)  
+    - Tooltip: crime type, location, district, date (or per-cell count and most common type)  
     Enables:
     - Micro-hotspot detection  
     - Spatial clustering analysis  
@@ -330,29 +872,25 @@ with st.container():
     available_years = sorted(list(YEAR_TO_FILE.keys()))
 
     with f1:
-        # ---- CURRENT IMPLEMENTATION: single year selection ----
-        selected_year = st.selectbox(
-            "Year (single selection – one year at a time for stability)",
+        # ---- CURRENT IMPLEMENTATION: multi-year selection ----
+        selected_years = st.multiselect(
+            "Years",
             options=available_years,
-            index=len(available_years) - 1,  # default = latest year
-        )
-        st.caption(
-            "Note: For performance and clarity, the dashboard is restricted to **one year at a time**. "
-            "Selecting a different year will replace the current selection."
+            default=[max(available_years)],
         )
 
+        if not selected_years:
+            st.warning("Please select at least one year.")
+            st.stop()
+
         # ---- PREVIOUS ATTEMPTS (kept commented to show work) ----
-        # Multi-year selection using multiselect (did not work well with our large data)
-        # selected_years = st.multiselect(
-        #     "Years",
+        # Single year selection (used while every rerun re-read and concatenated the raw files)
+        # selected_year = st.selectbox(
+        #     "Year (single selection – one year at a time for stability)",
         #     options=available_years,
-        #     default=[max(available_years)],
+        #     index=len(available_years) - 1,  # default = latest year
         # )
         #
-        # if not selected_years:
-        #     st.warning("Please select at least one year.")
-        #     st.stop()
-        #
         # Slider-based year range (early experiment, kept for reference)
         # year_start, year_end = st.slider(
         #     "Year range",
@@ -364,8 +902,9 @@ with st.container():
         # )
         # selected_years = list(range(year_start, year_end + 1))
 
-    # For the actual app logic we now always pass a **single-element list**:
-    selected_years = [selected_year]
+    # Sorted tuple: a hashable cache key, and the files are read in chronological order
+    selected_years = tuple(sorted(selected_years))
+    stop_if_data_missing(selected_years)
 
     # Load data for selected years
     # Commenting this to add a new addition about bufferring. Since the data is large and sometimes it can take longer to render.
@@ -374,12 +913,7 @@ with st.container():
     with st.spinner("Thank you for your patience! Loading and processing the requested data..."):
         data = load_multi_year_data(selected_years)
 
-    if "Primary Type" in data.columns:
-        primary_types = sorted(
-            data["Primary Type"].dropna().astype(str).unique().tolist()
-        )
-    else:
-        primary_types = []
+    primary_types, districts, loc_descs = option_lists(selected_years)
 
     with f2:
         # "Select all" behaviour via checkbox
@@ -400,16 +934,6 @@ with st.container():
     # Row 2: Districts / Location Description
     f3, f4 = st.columns(2)
 
-    if "District" in data.columns:
-        # Sort districts in chronological/numeric order but keep them as strings
-        district_vals = data["District"].dropna().astype(str).unique().tolist()
-        try:
-            districts = sorted(district_vals, key=lambda x: int(float(x)))
-        except Exception:
-            districts = sorted(district_vals)
-    else:
-        districts = []
-
     with f3:
         select_all_districts = st.checkbox("Select all police districts", value=True)
         if select_all_districts:
@@ -425,11 +949,6 @@ with st.container():
                 default=districts,
             )
 
-    if "Location Description" in data.columns:
-        loc_descs = sorted(data["Location Description"].dropna().astype(str).unique().tolist())
-    else:
-        loc_descs = []
-
     with f4:
         select_all_locations = st.checkbox("Select all locations", value=False)
         if select_all_locations:
@@ -449,19 +968,26 @@ with st.container():
 # APPLY FILTERS
 # -------------------------
 
+# Hashable filter keys: an empty tuple means "no filter" for that column, so
+# "all selected" and "none selected" share one cache entry
+pt_key = (
+    tuple(sorted(selected_primary_types))
+    if selected_primary_types and len(selected_primary_types) < len(primary_types)
+    else ()
+)
+district_key = (
+    tuple(sorted(selected_districts))
+    if selected_districts and len(selected_districts) < len(districts)
+    else ()
+)
+loc_key = tuple(sorted(selected_locations))
+
 with st.spinner("Filtering data..."):
-    filtered = data.copy()
-    
-    # Only filter by Primary Type if user has chosen a strict subset
-    if selected_primary_types and len(selected_primary_types) < len(primary_types):
-        filtered = filtered[filtered["Primary Type"].isin(selected_primary_types)]
-    
-    # Only filter by District if user has chosen a strict subset
-    if selected_districts and len(selected_districts) < len(districts):
-        filtered = filtered[filtered["District"].isin(selected_districts)]
-    
-    if selected_locations:
-        filtered = filtered[filtered["Location Description"].isin(selected_locations)]
+    # The metrics come from the summary cube, so no filtered copy of the rows
+    # is built here; the tabs and the preview each filter what they need
+    total_crimes, arrest_rate, domestic_share, first_date, last_date = compute_summary_metrics(
+        selected_years, pt_key, district_key, loc_key
+    )
 
     # Used this piece of code to debug a plot renderring issue
     # st.write("DEBUG – filtered rows:", len(filtered))
@@ -472,7 +998,7 @@ with st.spinner("Filtering data..."):
     # if "Year" in filtered.columns:
     #     st.write("DEBUG – unique Years:", filtered["Year"].unique().tolist())
     
-    if filtered.empty:
+    if not total_crimes:
         st.error("No data left after applying filters. Try relaxing your selections.")
         st.stop()
 
@@ -482,25 +1008,6 @@ with st.spinner("Filtering data..."):
 
 st.subheader("Summary Metrics (under current filters)")
 
-total_crimes = len(filtered)
-
-if "Arrest" in filtered.columns:
-    arrest_rate = filtered["Arrest"].mean() * 100
-else:
-    arrest_rate = None
-
-if "Domestic" in filtered.columns:
-    domestic_share = filtered["Domestic"].mean() * 100
-else:
-    domestic_share = None
-
-if "YearMonth" in filtered.columns:
-    first_date = filtered["YearMonth"].min()
-    last_date = filtered["YearMonth"].max()
-else:
-    first_date = None
-    last_date = None
-
 c1, c2, c3, c4 = st.columns(4)
 
 c1.metric("Total Incidents", f"{total_crimes:,}")
@@ -528,6 +1035,9 @@ overview_tab, spatial_tab, temporal_tab = st.tabs(
     ["Crime Overview", "Spatial Analysis", "Temporal & Arrest Patterns"]
 )
 
+# Data-less chart specs shared by the Overview and Temporal tabs
+templates = chart_templates(tuple(primary_types))
+
 # =====================================================
 # TAB 1: CRIME OVERVIEW – DRIVER / DRIVEN
 # =====================================================
@@ -535,106 +1045,47 @@ with overview_tab:
     with st.spinner("Rendering crime overview..."):
         st.markdown("### Driver & Driven Plots – Crime Types, Districts, Time")
 
-        # ---- DRIVER PLOT: Crimes by Primary Type (aggregated) ----
-        driver_df = (
-            filtered
-            .groupby("Primary Type", as_index=False)
-            .size()
-            .rename(columns={"size": "Crime Count"})
-        )
+        # Driver totals do not depend on the pick, so take them from the unpicked entry
+        driver_df = compute_aggregates(selected_years, pt_key, district_key, loc_key)[0]
 
         if driver_df.empty:
             st.warning("No data available for the current filter selection to build the driver plot.")
         else:
-            selection = alt.selection_multi(fields=["Primary Type"], empty="all")
-
-            driver_chart = (
-                alt.Chart(driver_df)
-                .mark_bar()
-                .encode(
-                    x=alt.X("Primary Type:N", sort="-y", title="Primary Crime Type"),
-                    y=alt.Y("Crime Count:Q", title="Number of Crimes"),
-                    color=alt.condition(
-                        selection,
-                        alt.Color("Primary Type:N", legend=None),
-                        alt.value("lightgray")
-                    ),
-                    tooltip=[
-                        alt.Tooltip("Primary Type:N", title="Primary Type"),
-                        alt.Tooltip("Crime Count:Q", title="Number of Crimes")
-                    ]
-                )
-                .add_selection(selection)
-                .properties(
-                    width=900,
-                    height=300,
-                    title="Driver Plot – Crime Counts by Primary Type"
-                )
-            )
+            driver_chart = templates["driver"].properties(data=driver_df)
 
-            # ---- DRIVEN PLOT 1: Crimes by District (aggregated) ----
-            district_df = (
-                filtered
-                .groupby(["District", "Primary Type"], as_index=False)
-                .size()
-                .rename(columns={"size": "Crime Count"})
+            driver_event = st.altair_chart(
+                driver_chart, use_container_width=True, on_select="rerun", key="driver_chart"
             )
-
-            district_chart = (
-                alt.Chart(district_df)
-                .transform_filter(selection)
-                .mark_bar()
-                .encode(
-                    x=alt.X("District:N", title="Police District"),
-                    y=alt.Y("Crime Count:Q", title="Number of Crimes"),
-                    color=alt.Color("District:N", title="District"),
-                    tooltip=[
-                        alt.Tooltip("District:N", title="District"),
-                        alt.Tooltip("Crime Count:Q", title="Number of Crimes")
-                    ]
-                )
-                .properties(
-                    width=900,
-                    height=300,
-                    title="Driven Plot 1 – Crimes by District (for selected Primary Types)"
-                )
+            picked_key = tuple(sorted(
+                point["Primary Type"]
+                for point in driver_event.selection.get("driver_pick", [])
+                if "Primary Type" in point
+            ))
+            _, district_df, trend_df = compute_aggregates(
+                selected_years, pt_key, district_key, loc_key, picked_key
             )
 
-            # ---- DRIVEN PLOT 2: Monthly Trend (aggregated) ----
-            if "YearMonth" in filtered.columns:
-                trend_df = (
-                    filtered
-                    .groupby(["YearMonth", "Primary Type"], as_index=False)
-                    .size()
-                    .rename(columns={"size": "Crime Count"})
-                )
+            # ---- DRIVEN PLOT 1: Crimes by District (aggregated) ----
+            district_chart = templates["district"].properties(data=district_df)
 
-                trend_chart = (
-                    alt.Chart(trend_df)
-                    .transform_filter(selection)
-                    .mark_line(point=True)
-                    .encode(
-                        x=alt.X("YearMonth:T", title="Year-Month"),
-                        y=alt.Y("Crime Count:Q", title="Number of Crimes"),
-                        color=alt.Color("Primary Type:N", title="Primary Type"),
-                        tooltip=[
-                            alt.Tooltip("YearMonth:T", title="Year-Month"),
-                            alt.Tooltip("Primary Type:N", title="Primary Type"),
-                            alt.Tooltip("Crime Count:Q", title="Number of Crimes")
-                        ]
-                    )
-                    .properties(
-                        width=900,
-                        height=300,
-                        title="Driven Plot 2 – Monthly Trend (for selected Primary Types)"
+            # ---- DRIVEN PLOT 2: Monthly Trend (aggregated) ----
+            if trend_df is not None:
+                # Full-domain scale for stable colours, but a legend of only the
+                # types this trend draws (the picked ones, or all in the slice)
+                drawn_types = set(trend_df["Primary Type"].astype(str))
+                trend_chart = templates["trend"].properties(data=trend_df).encode(
+                    color=alt.Color(
+                        "Primary Type:N",
+                        title="Primary Type",
+                        scale=primary_type_scale(tuple(primary_types)),
+                        legend=alt.Legend(values=[t for t in primary_types if t in drawn_types]),
                     )
                 )
 
-                combined_chart = driver_chart & district_chart & trend_chart
+                combined_chart = district_chart & trend_chart
                 st.altair_chart(combined_chart, use_container_width=True)
             else:
-                combined_chart = driver_chart & district_chart
-                st.altair_chart(combined_chart, use_container_width=True)
+                st.altair_chart(district_chart, use_container_width=True)
                 st.info("No YearMonth information available to show time trends.")
 
 # =====================================================
@@ -642,39 +1093,60 @@ with overview_tab:
 # =====================================================
 with spatial_tab:
     with st.spinner("Rendering spatial analysis..."):
-        st.markdown("### Spatial Analysis – Latitude/Longitude (sampled for performance)")
-
-        if {"Latitude", "Longitude"}.issubset(filtered.columns):
-            sample_size = min(5000, len(filtered))
-            spatial_sample = filtered.dropna(subset=["Latitude", "Longitude"]).sample(
-                n=sample_size, random_state=42
-            ) if len(filtered) > sample_size else filtered.dropna(subset=["Latitude", "Longitude"])
+        st.markdown("### Spatial Analysis – Latitude/Longitude")
+
+        if {"Latitude", "Longitude"}.issubset(data.columns):
+            map_view = st.radio(
+                "Map view",
+                ["Density grid", "Sampled points"],
+                horizontal=True,
+                help="The density grid counts every incident; the scatter draws a sample of individual incidents.",
+            )
 
-            if spatial_sample.empty:
-                st.warning("No spatial data (Latitude/Longitude) available for current filters.")
-            else:
-                spatial_chart = (
-                    alt.Chart(spatial_sample)
-                    .mark_circle(opacity=0.6)
-                    .encode(
-                        longitude="Longitude:Q",
-                        latitude="Latitude:Q",
-                        color=alt.Color("Primary Type:N", title="Primary Type"),
-                        tooltip=[
-                            alt.Tooltip("Primary Type:N", title="Primary Type"),
-                            alt.Tooltip("Location Description:N", title="Location"),
-                            alt.Tooltip("District:N", title="District"),
-                            alt.Tooltip("Date:T", title="Date"),
-                        ]
-                    )
-                    .properties(
-                        width=800,
-                        height=500
+            if map_view == "Density grid":
+                density = compute_density(selected_years, pt_key, district_key, loc_key)
+
+                if density.empty:
+                    st.warning("No spatial data (Latitude/Longitude) available for current filters.")
+                else:
+                    # aria=False: no per-mark ARIA description strings for thousands of cells
+                    density_chart = (
+                        alt.Chart(density)
+                        .mark_rect(aria=False)
+                        .encode(
+                            x=alt.X("lon_lo:Q", title="Longitude", scale=alt.Scale(zero=False)),
+                            x2="lon_hi:Q",
+                            y=alt.Y("lat_lo:Q", title="Latitude", scale=alt.Scale(zero=False)),
+                            y2="lat_hi:Q",
+                            color=alt.Color(
+                                "Count:Q",
+                                title="Incidents",
+                                scale=alt.Scale(type="log", scheme="blues"),
+                            ),
+                            tooltip=[
+                                alt.Tooltip("Count:Q", title="Incidents"),
+                                alt.Tooltip("Top Type:N", title="Most common type"),
+                            ]
+                        )
+                        .properties(
+                            width=800,
+                            height=500
+                        )
                     )
-                )
 
-                st.altair_chart(spatial_chart, use_container_width=True)
-                st.caption("Note: points are sampled for performance; use filters in the top bar to narrow down.")
+                    st.altair_chart(density_chart, use_container_width=True)
+                    st.caption("Note: every geolocated incident is counted into a grid cell; hover a cell for its count and most common crime type.")
+            else:
+                spatial_sample = compute_sample(selected_years, pt_key, district_key, loc_key)
+
+                if spatial_sample.empty:
+                    st.warning("No spatial data (Latitude/Longitude) available for current filters.")
+                else:
+                    # WebGL scatter, one constant-colour layer per crime group
+                    deck, legend = crime_map.scatter_deck(spatial_sample)
+                    st.markdown(legend, unsafe_allow_html=True)
+                    st.pydeck_chart(deck, use_container_width=True, height=500)
+                    st.caption("Note: points are sampled for performance; use filters in the top bar to narrow down.")
         else:
             st.info("Latitude/Longitude not available in the current data selection.")
 
@@ -685,28 +1157,16 @@ with temporal_tab:
     with st.spinner("Rendering temporal & arrest patterns..."):
         st.markdown("### Temporal & Arrest Patterns")
 
+        # Charts get the per-hour / per-weekday counts, never the raw rows
+        hour_df, weekday_df = compute_time_counts(selected_years, pt_key, district_key, loc_key)
+
         col_t1, col_t2 = st.columns(2)
 
         with col_t1:
             st.markdown("#### Incidents by Hour of Day")
 
-            if "Hour" in filtered.columns:
-                hour_chart = (
-                    alt.Chart(filtered)
-                    .mark_bar()
-                    .encode(
-                        x=alt.X("Hour:O", title="Hour of Day"),
-                        y=alt.Y("count():Q", title="Number of Crimes"),
-                        tooltip=[
-                            alt.Tooltip("Hour:O", title="Hour"),
-                            alt.Tooltip("count():Q", title="Number of Crimes")
-                        ]
-                    )
-                    .properties(
-                        width=350,
-                        height=300
-                    )
-                )
+            if hour_df is not None:
+                hour_chart = templates["hour"].properties(data=hour_df)
                 st.altair_chart(hour_chart, use_container_width=True)
             else:
                 st.info("No hour information available in Date column.")
@@ -714,57 +1174,21 @@ with temporal_tab:
         with col_t2:
             st.markdown("#### Incidents by Day of Week")
 
-            if "Weekday" in filtered.columns:
-                weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                weekday_chart = (
-                    alt.Chart(filtered)
-                    .mark_bar()
-                    .encode(
-                        x=alt.X("Weekday:N", sort=weekday_order, title="Day of Week"),
-                        y=alt.Y("count():Q", title="Number of Crimes"),
-                        tooltip=[
-                            alt.Tooltip("Weekday:N", title="Day"),
-                            alt.Tooltip("count():Q", title="Number of Crimes")
-                        ]
-                    )
-                    .properties(
-                        width=350,
-                        height=300
-                    )
-                )
+            if weekday_df is not None:
+                weekday_chart = templates["weekday"].properties(data=weekday_df)
                 st.altair_chart(weekday_chart, use_container_width=True)
             else:
                 st.info("No weekday information available.")
 
         st.markdown("#### Arrest Rate by Primary Type")
 
-        if "Arrest" in filtered.columns and "Primary Type" in filtered.columns:
-            arrest_df = (
-                filtered
-                .groupby("Primary Type", as_index=False)["Arrest"]
-                .mean()
-                .rename(columns={"Arrest": "Arrest Rate"})
-            )
+        if "Arrest" in data.columns and "Primary Type" in data.columns:
+            arrest_df = compute_arrest_rates(selected_years, pt_key, district_key, loc_key)
 
             if arrest_df.empty:
                 st.warning("No arrest information available for current filters.")
             else:
-                arrest_chart = (
-                    alt.Chart(arrest_df)
-                    .mark_bar()
-                    .encode(
-                        x=alt.X("Primary Type:N", sort="-y", title="Primary Crime Type"),
-                        y=alt.Y("Arrest Rate:Q", title="Arrest Rate", axis=alt.Axis(format="%")),
-                        tooltip=[
-                            alt.Tooltip("Primary Type:N", title="Primary Type"),
-                            alt.Tooltip("Arrest Rate:Q", title="Arrest Rate", format=".1%")
-                        ]
-                    )
-                    .properties(
-                        width=900,
-                        height=350
-                    )
-                )
+                arrest_chart = templates["arrest"].properties(data=arrest_df)
                 st.altair_chart(arrest_chart, use_container_width=True)
         else:
             st.info("Arrest information is not available.")
@@ -774,13 +1198,16 @@ with temporal_tab:
 # -------------------------
 
 with st.expander("Preview Filtered Data"):
-    st.write(f"Showing **{len(filtered):,} rows** after filters.")
-    st.dataframe(filtered.head(100))
+    st.write(f"Showing **{total_crimes:,} rows** after filters.")
+    st.dataframe(preview_rows(selected_years, pt_key, district_key, loc_key))
 
 with st.expander("Data Source Links"):
     st.markdown("""
-    - **Main crime dataset (yearly splits, e.g., Crimes_2009.csv … Crimes_2024.csv):**  
+    - **Main crime dataset (yearly splits, e.g., Crimes_2010.csv … Crimes_2020.csv):**  
       Stored in this repo under `https://github.com/RohitYadav-edu/RohitYadav-edu.github.io/tree/main/project/data`.
+      The dashboard does not read the CSVs directly: `python project/convert_to_parquet.py` converts each
+      one into `Crimes_YYYY.parquet` (typed columns plus the derived YearMonth, Weekday and Hour) and
+      `summary_YYYY.parquet`, a pre-aggregated count cube behind the Overview and Crime Types charts.
     - **Original full crime dataset description:**  
       'https://catalog.data.gov/dataset/crimes-2001-to-present'
     """)
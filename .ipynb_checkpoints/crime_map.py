@@ -0,0 +1,97 @@
+"""Sampled-incident scatter shared by the dashboards (app.py and app_old.py).
+
+Both apps draw their "Sampled points" map view with the helpers below, so the
+colour table, the tooltip and the layer building exist once. The apps choose
+and filter the rows; this module only groups, formats and draws them.
+"""
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+
+# Columns the scatter's marks and tooltips use; only these go into the payload
+SCATTER_COLS = ["Longitude", "Latitude", "Primary Type", "Location Description", "District", "Date"]
+
+# The scatter colours the most frequent types of the slice and greys the rest
+TOP_TYPES = 5
+
+# RGB per top type in rank order, and the grey reserved for "Other"
+TOP_TYPE_COLORS = [
+    [76, 120, 168],
+    [245, 133, 24],
+    [228, 87, 86],
+    [114, 183, 178],
+    [84, 162, 75],
+]
+OTHER_COLOR = [148, 163, 184]
+POINT_ALPHA = 140
+
+TOOLTIP = {
+    "html": "<b>{Primary Type}</b><br/>{Location Description}<br/>District {District}<br/>{Date}",
+}
+
+
+def top_types(rows: pd.DataFrame, n: int = TOP_TYPES) -> list[str]:
+    """The n most frequent Primary Types among the rows."""
+    # observed=True: a categorical value_counts() would also rank the types
+    # absent from the rows, at a count of 0
+    return rows.groupby("Primary Type", observed=True).size().nlargest(n).index.tolist()
+
+
+def scatter_points(points: pd.DataFrame, colored_types: list[str]) -> pd.DataFrame:
+    """The sampled rows as drawn: SCATTER_COLS plus a "Crime Group" column.
+
+    Crime Group is the Primary Type for the colored_types and "Other" for the
+    rest; Date and the coordinates are formatted compactly for the JSON payload.
+    """
+    points = points[SCATTER_COLS]
+    # Group code per Primary Type code from a small lookup array rather than
+    # hashing every type string; the last slot (code -1, missing) and every
+    # type outside colored_types map to "Other"
+    types = points["Primary Type"].cat
+    group_of_type = np.full(len(types.categories) + 1, len(colored_types))
+    group_of_type[types.categories.get_indexer(colored_types)] = np.arange(len(colored_types))
+    return points.assign(**{
+        "Crime Group": pd.Categorical.from_codes(
+            group_of_type[types.codes.to_numpy()],
+            categories=[*colored_types, "Other"],
+        ),
+        # deck.gl tooltips show raw JSON values, so the timestamp is pre-formatted
+        "Date": points["Date"].dt.strftime("%Y-%m-%d %H:%M"),
+        # float32 values print with ~15 spurious digits in the JSON payload;
+        # 5 decimals (~1 m) is the precision actually stored
+        "Longitude": points["Longitude"].astype("float64").round(5),
+        "Latitude": points["Latitude"].astype("float64").round(5),
+    })
+
+
+def scatter_deck(points: pd.DataFrame) -> tuple[pdk.Deck, str]:
+    """A deck.gl scatter of scatter_points() output and its HTML colour legend.
+
+    One layer per crime group, so each layer has a constant colour instead of
+    a per-point colour array in the payload.
+    """
+    *colored_types, other = points["Crime Group"].cat.categories
+    colors = {**dict(zip(colored_types, TOP_TYPE_COLORS)), other: OTHER_COLOR}
+    layers = [
+        pdk.Layer(
+            "ScatterplotLayer",
+            data=group_points.drop(columns="Crime Group"),
+            get_position=["Longitude", "Latitude"],
+            get_radius=40,
+            radius_min_pixels=1.5,
+            get_fill_color=colors[group] + [POINT_ALPHA],
+            pickable=True,
+        )
+        for group, group_points in points.groupby("Crime Group", observed=True, sort=True)
+    ]
+    deck = pdk.Deck(
+        layers=layers,
+        initial_view_state=pdk.ViewState(latitude=41.84, longitude=-87.68, zoom=9.5),
+        tooltip=TOOLTIP,
+    )
+    legend = " ".join(
+        f'<span style="color: rgb({r},{g},{b})">●</span> {group}'
+        for group, (r, g, b) in colors.items()
+    )
+    return deck, legend
@@ -0,0 +1,192 @@
+"""One-time conversion of the per-year Chicago crime CSVs to Parquet.
+
+Run from the repository root (the same working directory the dashboard uses):
+
+    python project/convert_to_parquet.py
+
+Each `project/data/Crimes_YYYY.csv` is parsed once with explicit dtypes and
+written next to it as `Crimes_YYYY.parquet`, which the dashboard loads instead
+of the CSV, together with a pre-aggregated `summary_YYYY.parquet` count cube
+that backs the Overview and Crime Types tabs.
+
+Rows whose Date cannot be parsed are dropped, with a logged warning giving the
+count per year: every dashboard view is keyed on the derived month, weekday or
+hour, which such a row does not have.
+"""
+
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+logger = logging.getLogger(__name__)
+
+YEAR_TO_FILE = {
+    year: f"project/data/Crimes_{year}.csv"
+    for year in range(2010, 2021)  # 2010–2020 inclusive on HuggingFace
+}
+
+# Raw CSV columns the dashboard uses; the ~10 others (Case Number, IUCR, FBI Code,
+# X/Y Coordinate, Updated On, ...) are never read
+USED_COLS = [
+    "Date",
+    "Primary Type",
+    "Description",
+    "Location Description",
+    "Arrest",
+    "Domestic",
+    "District",
+    "Ward",
+    "Community Area",
+    "Beat",
+    "Latitude",
+    "Longitude",
+]
+
+# Low-cardinality text columns stored as categoricals
+CATEGORY_COLS = [
+    "Primary Type",
+    "District",
+    "Ward",
+    "Community Area",
+    "Beat",
+    "Location Description",
+]
+
+FLAG_COLS = ["Arrest", "Domestic"]
+
+# Spellings accepted for the flag columns; the portal exports use "true"/"false"
+FLAG_TRUE_VALUES = ["true", "True", "TRUE", "t", "T", "1", "yes", "Yes", "YES", "y", "Y"]
+FLAG_FALSE_VALUES = ["false", "False", "FALSE", "f", "F", "0", "no", "No", "NO", "n", "N"]
+
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Timestamp format used by the Chicago Data Portal exports, e.g. "01/05/2020 11:30:00 PM"
+DATE_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+
+NS_PER_HOUR = 3_600_000_000_000
+NS_PER_DAY = 24 * NS_PER_HOUR
+
+# float32 keeps ~1 m precision, plenty for a city-scale scatter, at half the memory
+COORD_COLS = ["Latitude", "Longitude"]
+
+# Arrow CSV column types: dictionary-encoded text becomes pandas categoricals.
+# Date is parsed to a timestamp by the reader itself (see read_crimes_csv)
+CSV_TYPES = {
+    "Date": pa.timestamp("ns"),
+    "Description": pa.string(),
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORY_COLS},
+    **{col: pa.bool_() for col in FLAG_COLS},
+    **{col: pa.float32() for col in COORD_COLS},
+}
+
+# Dimensions of the summary count cube; must match CUBE_DIMS in the dashboard
+SUMMARY_DIMS = [
+    "Primary Type",
+    "District",
+    "YearMonth",
+    "Arrest",
+    "Domestic",
+    "Location Description",
+]
+
+
+def read_crimes_csv(csv_path: str) -> pd.DataFrame:
+    """Parse one yearly CSV with Arrow's reader, timestamps included."""
+    def read(column_types: dict) -> pa.Table:
+        # Arrow's CSV reader parses in parallel across cores; empty cells are
+        # nulls in the text columns too, as with pandas' own reader
+        return pv.read_csv(
+            csv_path,
+            convert_options=pv.ConvertOptions(
+                include_columns=USED_COLS,
+                column_types=column_types,
+                strings_can_be_null=True,
+                true_values=FLAG_TRUE_VALUES,
+                false_values=FLAG_FALSE_VALUES,
+                timestamp_parsers=[DATE_FORMAT],
+            ),
+        )
+
+    try:
+        return read(CSV_TYPES).to_pandas()
+    except pa.ArrowInvalid:
+        # Arrow rejects the whole file on one malformed value in any typed column
+        # (a timestamp, a flag or a coordinate); read those columns as text instead
+        # and coerce the bad values to missing in pandas
+        coerced_cols = ["Date", *FLAG_COLS, *COORD_COLS]
+        df = read({**CSV_TYPES, **{col: pa.string() for col in coerced_cols}}).to_pandas()
+        df["Date"] = pd.to_datetime(df["Date"], format=DATE_FORMAT, errors="coerce", cache=True)
+        flag_values = {
+            **dict.fromkeys(FLAG_TRUE_VALUES, True),
+            **dict.fromkeys(FLAG_FALSE_VALUES, False),
+        }
+        for col in FLAG_COLS:
+            df[col] = df[col].map(flag_values).astype("boolean")
+        for col in COORD_COLS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+        return df
+
+
+def convert_year(year: int) -> tuple[str, str]:
+    """Convert one year's CSV to Parquet and return the row and summary Parquet paths."""
+    csv_path = YEAR_TO_FILE[year]
+    parquet_path = csv_path.replace(".csv", ".parquet")
+    summary_path = f"project/data/summary_{year}.parquet"
+
+    df = read_crimes_csv(csv_path)
+    bad_dates = df["Date"].isna()
+    if bad_dates.any():
+        logger.warning(
+            "%d: dropping %s of %s rows with a missing or unparseable Date",
+            year, f"{bad_dates.sum():,}", f"{len(df):,}",
+        )
+        df = df[~bad_dates].reset_index(drop=True)
+
+    # Chronological row order lets the dashboard count months by run length
+    df = df.sort_values("Date", kind="stable", ignore_index=True)
+
+    # Arrow's dictionary decode keeps categories in first-appearance order; sort
+    # them as pandas' dtype="category" did, so the stored categories (and the
+    # dashboard's option lists read off them) are in sorted order
+    for col in CATEGORY_COLS:
+        df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+
+    # Missing flags count as "no arrest" / "not domestic"
+    for col in FLAG_COLS:
+        df[col] = df[col].fillna(False).astype(bool)
+
+    # Temporal features used by the dashboard, derived once here instead of on every load.
+    # Plain integer arithmetic on the naive datetime64 buffer replaces five .dt scans:
+    # one month-resolution view gives Year/Month/YearMonth, day/hour counts the rest
+    months = df["Date"].values.astype("datetime64[M]")
+    month_num = months.view("i8")  # months since 1970-01
+    ns = df["Date"].values.view("i8")
+    df["Year"] = (month_num // 12 + 1970).astype("int16")
+    df["Month"] = (month_num % 12 + 1).astype("int8")
+    df["YearMonth"] = months.astype("datetime64[ns]")
+    # 1970-01-01 was a Thursday, code 3 with Monday = 0
+    df["Weekday"] = pd.Categorical.from_codes((ns // NS_PER_DAY + 3) % 7, categories=DAY_ORDER)
+    df["Hour"] = (ns // NS_PER_HOUR % 24).astype("int8")
+
+    # Rows the map can place, so the dashboard need not rescan both coordinates for NaNs
+    df["GeomValid"] = df[COORD_COLS].notna().all(axis=1)
+
+    df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+
+    # dropna=False keeps incidents with a missing District/Location in the counts
+    summary = df.groupby(SUMMARY_DIMS, observed=True, dropna=False).size().reset_index(name="Count")
+    summary.to_parquet(summary_path, engine="pyarrow", compression="zstd", index=False)
+    return parquet_path, summary_path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    for year in YEAR_TO_FILE:
+        if not os.path.exists(YEAR_TO_FILE[year]):
+            logger.warning("Skipping %d: %s not found", year, YEAR_TO_FILE[year])
+            continue
+        for path in convert_year(year):
+            logger.info("Wrote %s", path)